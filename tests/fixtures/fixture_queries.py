@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture
+def query_budgets():
+    """Проваливает тест, если представление превысило бюджет запросов."""
+    from core.queries import collect_violations
+
+    with collect_violations() as violations:
+        yield violations
+    if violations:
+        pytest.fail(
+            'Превышен бюджет SQL-запросов:\n' + '\n'.join(violations),
+            pytrace=False
+        )
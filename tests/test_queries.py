@@ -0,0 +1,50 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+class TestQueryBudgets:
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        # страницы из кэша не выполняют запросов
+        cache.clear()
+
+    def test_feeds_stay_within_budget(
+            self, user_client, query_budgets,
+            few_posts_with_group,
+            another_few_posts_with_group_with_follower):
+        post = few_posts_with_group
+        urls = (
+            '/',
+            '/?page=2',
+            f'/group/{post.group.slug}/',
+            f'/profile/{post.author.username}/',
+            f'/posts/{post.pk}/',
+        )
+        # user_client - это тот же client, поэтому гость отдельный
+        for url in urls:
+            for some_client in (Client(), user_client):
+                response = some_client.get(url)
+                assert response.status_code == 200, (
+                    f'Страница `{url}` работает неправильно'
+                )
+        response = user_client.get('/follow/')
+        assert response.status_code == 200, (
+            'Страница `/follow/` работает неправильно'
+        )
+
+    def test_create_and_comment_stay_within_budget(
+            self, user_client, query_budgets, post):
+        response = user_client.post('/create/', data={'text': 'Новый пост'})
+        assert response.status_code == 302, (
+            'Страница `/create/` работает неправильно'
+        )
+        response = user_client.post(
+            f'/posts/{post.pk}/comment/', data={'text': 'Комментарий'}
+        )
+        assert response.status_code == 302, (
+            'Добавление комментария работает неправильно'
+        )
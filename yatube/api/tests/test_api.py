@@ -0,0 +1,123 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=constants.USER_NAME)
+        cls.reader = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.group = Group.objects.create(
+            title=constants.GROUP_TITLE,
+            slug=constants.GROUP_SLUG,
+            description=constants.GROUP_DESCRIPTION,
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'{constants.POST_TEXT} {i}',
+                author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text=constants.COMMENT_TEXT
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, name, params=None, **kwargs):
+        response = self.guest.get(reverse(f'api:{name}', kwargs=kwargs),
+                                  params or {})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response
+
+    def test_posts_are_paged_by_cursor(self):
+        first = self.get('post_list', {'limit': 3}).json()
+        self.assertEqual(
+            [post['id'] for post in first['results']],
+            [post.pk for post in self.posts[::-1][:3]]
+        )
+        second = self.guest.get(first['next']).json()
+        self.assertEqual(
+            [post['id'] for post in second['results']],
+            [post.pk for post in self.posts[::-1][3:]]
+        )
+        self.assertIsNone(second['next'])
+        self.assertIn('limit=3', second['previous'])
+
+    def test_sparse_fields_and_filters(self):
+        data = self.get(
+            'post_list', {'fields': 'id,group', 'group': self.group.slug}
+        ).json()
+        self.assertEqual(
+            data['results'],
+            [{'id': post.pk, 'group': self.group.slug}
+             for post in self.posts[::-1] if post.group_id]
+        )
+        response = self.get('post_list', {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_detail_and_comments(self):
+        post = self.posts[0]
+        data = self.get('post_detail', post_id=post.pk).json()
+        self.assertEqual(data['author'], self.author.username)
+        self.assertEqual(data['comments_count'], 1)
+        self.assertIsNone(data['image'])
+        comments = self.get('comment_list', post_id=post.pk).json()
+        self.assertEqual(comments['results'][0]['text'],
+                         constants.COMMENT_TEXT)
+        self.assertEqual(
+            self.get('post_detail', post_id=0).status_code, 404
+        )
+
+    def test_groups_and_profiles(self):
+        groups = self.get('group_list', {'fields': 'slug'}).json()
+        self.assertEqual(groups['results'], [{'slug': self.group.slug}])
+        profile = self.get(
+            'profile_detail', username=self.author.username
+        ).json()
+        self.assertEqual(profile['posts_count'], 5)
+        self.assertEqual(profile['followers_count'], 1)
+        followers = self.get(
+            'follower_list', username=self.author.username
+        ).json()
+        self.assertEqual(followers['results'][0]['username'],
+                         self.reader.username)
+        following = self.get(
+            'following_list', username=self.reader.username
+        ).json()
+        self.assertEqual(following['results'][0]['username'],
+                         self.author.username)
+
+    def test_profile_counters_are_invalidated(self):
+        profile = self.get('profile_detail', username=self.author.username)
+        self.assertEqual(profile.json()['posts_count'], 5)
+        self.assertEqual(profile.json()['following_count'], 0)
+        post = Post.objects.create(
+            text=constants.POST_TEXT_2, author=self.author
+        )
+        Follow.objects.create(user=self.author, author=self.reader)
+        profile = self.get('profile_detail', username=self.author.username)
+        self.assertEqual(profile.json()['posts_count'], 6)
+        self.assertEqual(profile.json()['following_count'], 1)
+        post.delete()
+        profile = self.get('profile_detail', username=self.author.username)
+        self.assertEqual(profile.json()['posts_count'], 5)
+
+    def test_responses_are_cached_and_invalidated(self):
+        self.get('post_list')
+        with self.assertNumQueries(0):
+            self.get('post_list')
+        Post.objects.create(text=constants.POST_TEXT_2, author=self.author)
+        data = self.get('post_list').json()
+        self.assertEqual(data['results'][0]['text'], constants.POST_TEXT_2)
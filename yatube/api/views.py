@@ -0,0 +1,284 @@
+"""JSON API только для чтения.
+
+Ответы собираются из `values_list` без создания экземпляров моделей.
+Списки листаются курсором, как HTML-ленты; параметр `fields`
+оставляет в ответе только перечисленные поля. Ответы анонимам
+кэшируются и проверяются по ETag теми же декораторами, что и страницы.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from core.decorators import cache_anonymous, conditional_page
+from core.paginator import CursorPaginator, cursor_page
+from posts.models import Comment, Follow, Group, Post
+from posts.stats import get_stats
+from posts.views import post_page_scopes
+
+User = get_user_model()
+
+MAX_LIMIT = 100
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+# Поле ответа -> путь в запросе.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'created': 'created',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+FOLLOWER_FIELDS = {
+    'id': 'id',
+    'username': 'user__username',
+    'created': 'created',
+}
+FOLLOWING_FIELDS = {
+    'id': 'id',
+    'username': 'author__username',
+    'created': 'created',
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def json_error(message, status):
+    return JsonResponse(
+        {'detail': message}, status=status, json_dumps_params=JSON_PARAMS
+    )
+
+
+def api_view(scopes):
+    """GET-обработчик API: кэш, ETag и ошибки в JSON."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return json_error('Метод не поддерживается', 405)
+            try:
+                return view(request, *args, **kwargs)
+            except BadRequest as error:
+                return json_error(str(error), 400)
+            except Http404:
+                return json_error('Не найдено', 404)
+        return conditional_page(scopes)(cache_anonymous(scopes)(wrapper))
+    return decorator
+
+
+def selected_fields(request, fields):
+    """Поля из параметра `fields`; по умолчанию - все."""
+    names = request.GET.get('fields')
+    if not names:
+        return list(fields)
+    names = [name.strip() for name in names.split(',') if name.strip()]
+    unknown = set(names) - fields.keys()
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return names
+
+
+def serialize(row, names):
+    if 'image' in row:
+        row['image'] = (
+            settings.MEDIA_URL + row['image'] if row['image'] else None
+        )
+    return {name: row[name] for name in names}
+
+
+class ValuesCursorPaginator(CursorPaginator):
+    """Курсорный пагинатор, отдающий словари из `values_list`.
+
+    Поля ключа читаются вместе с остальными и в ответ попадают,
+    только если запрошены.
+    """
+
+    def __init__(self, queryset, per_page, fields, descending=True,
+                 key=('created', 'id')):
+        super().__init__(queryset, per_page, descending, key)
+        self.names = list(fields)
+        self.paths = [fields[name] for name in self.names]
+        for field in key:
+            if field not in self.paths:
+                self.names.append(field)
+                self.paths.append(field)
+        self.key_index = [self.paths.index(field) for field in key]
+
+    def fetch(self, cursor, descending, stop, start=0):
+        rows = self._seek(cursor, descending).values_list(*self.paths)
+        return [
+            (
+                tuple(row[index] for index in self.key_index),
+                dict(zip(self.names, row))
+            )
+            for row in rows[start:stop]
+        ]
+
+
+def page_response(request, queryset, fields, descending=True,
+                  key=('created', 'id'), parse_key=None):
+    names = selected_fields(request, fields)
+    try:
+        limit = min(int(request.GET.get('limit', settings.POSTS_PAGE_COUNT)),
+                    MAX_LIMIT)
+    except ValueError:
+        raise BadRequest('limit должен быть числом')
+    paginator = ValuesCursorPaginator(
+        queryset, max(limit, 1), fields, descending, key
+    )
+    if parse_key is not None:
+        paginator.parse_key = parse_key
+    page = cursor_page(request, paginator)
+    path = request.path
+    return JsonResponse(
+        {
+            'results': [serialize(row, names) for row in page],
+            'next': (
+                f'{path}?{page.base_query}after={page.next_cursor}'
+                if page.next_cursor else None
+            ),
+            'previous': (
+                f'{path}?{page.base_query}before={page.previous_cursor}'
+                if page.previous_cursor else None
+            ),
+        },
+        json_dumps_params=JSON_PARAMS
+    )
+
+
+def object_response(request, queryset, fields):
+    names = selected_fields(request, fields)
+    row = queryset.values(*fields.values()).first()
+    if row is None:
+        raise Http404
+    row = {name: row[path] for name, path in fields.items()}
+    return JsonResponse(serialize(row, names), json_dumps_params=JSON_PARAMS)
+
+
+def posts_scopes(**kwargs):
+    return ['posts']
+
+
+def comments_scopes(post_id):
+    return [f'post:{post_id}', 'users']
+
+
+def groups_scopes(**kwargs):
+    return ['groups']
+
+
+def user_id(username):
+    return (
+        User.objects
+        .filter(username=username)
+        .values_list('pk', flat=True)
+        .first()
+    )
+
+
+def profile_scopes(username):
+    pk = user_id(username)
+    return pk and [f'stats:{pk}', 'users']
+
+
+def following_scopes(username):
+    pk = user_id(username)
+    return pk and [f'follows:{pk}', 'users']
+
+
+@api_view(posts_scopes)
+def post_list(request):
+    filters = {}
+    if request.GET.get('group'):
+        filters['group__slug'] = request.GET['group']
+    if request.GET.get('author'):
+        filters['author__username'] = request.GET['author']
+    return page_response(
+        request, Post.objects.filter(**filters), POST_FIELDS
+    )
+
+
+@api_view(post_page_scopes)
+def post_detail(request, post_id):
+    return object_response(
+        request, Post.objects.filter(pk=post_id), POST_FIELDS
+    )
+
+
+@api_view(comments_scopes)
+def comment_list(request, post_id):
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    return page_response(
+        request,
+        Comment.objects.filter(post_id=post_id),
+        COMMENT_FIELDS,
+        descending=False
+    )
+
+
+@api_view(groups_scopes)
+def group_list(request):
+    # У групп нет даты создания: ключом курсора служит id.
+    return page_response(
+        request, Group.objects.all(), GROUP_FIELDS,
+        descending=False, key=('id', 'id'), parse_key=int
+    )
+
+
+@api_view(groups_scopes)
+def group_detail(request, slug):
+    return object_response(
+        request, Group.objects.filter(slug=slug), GROUP_FIELDS
+    )
+
+
+@api_view(profile_scopes)
+def profile_detail(request, username):
+    author = get_object_or_404(User, username=username)
+    stats = get_stats(author)
+    return JsonResponse(
+        {
+            'username': author.username,
+            'first_name': author.first_name,
+            'last_name': author.last_name,
+            'posts_count': stats.posts_count,
+            'followers_count': stats.followers_count,
+            'following_count': stats.following_count,
+        },
+        json_dumps_params=JSON_PARAMS
+    )
+
+
+@api_view(profile_scopes)
+def follower_list(request, username):
+    author = get_object_or_404(User, username=username)
+    return page_response(
+        request, Follow.objects.filter(author=author), FOLLOWER_FIELDS
+    )
+
+
+@api_view(following_scopes)
+def following_list(request, username):
+    user = get_object_or_404(User, username=username)
+    return page_response(
+        request, Follow.objects.filter(user=user), FOLLOWING_FIELDS
+    )
@@ -0,0 +1,87 @@
+"""Версии областей кэша.
+
+Каждой области (например, `posts`, `group:1`, `author:2`, `post:3`)
+соответствует счётчик в кэше. Ключи фрагментов включают версии
+своих областей, поэтому изменение данных сбрасывает фрагменты
+увеличением счётчика, а не удалением ключей. Фрагменты можно хранить
+часами: устаревшие версии просто перестают запрашиваться.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = 'version:{}'
+CHANGED_KEY = 'changed:{}'
+
+
+def _new_version():
+    # Счётчик, вытесненный из кэша, начинается заново с отметки
+    # времени, чтобы не совпасть со старой версией.
+    return time.time_ns() // 1000
+
+
+def get_versions(*scopes):
+    """Строка с текущими версиями областей."""
+    return get_versions_many([scopes])[0]
+
+
+def get_versions_many(scope_lists):
+    """Строки версий для нескольких наборов областей за один запрос."""
+    keys = {
+        VERSION_KEY.format(scope)
+        for scopes in scope_lists for scope in scopes
+    }
+    versions = cache.get_many(keys)
+    for key in keys - versions.keys():
+        cache.add(key, _new_version(), None)
+        versions[key] = cache.get(key)
+    return [
+        '.'.join(
+            str(versions[VERSION_KEY.format(scope)]) for scope in scopes
+        )
+        for scopes in scope_lists
+    ]
+
+
+def bump(*scopes):
+    """Сбрасывает кэш областей, увеличивая их версии."""
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _new_version(), None)
+    now = time.time()
+    cache.set_many(
+        {CHANGED_KEY.format(scope): now for scope in scopes}, None
+    )
+
+
+def last_modified(*scopes):
+    """Время последнего изменения областей, секунды Unix.
+
+    Для области, время изменения которой вытеснено из кэша,
+    считается, что она изменилась сейчас.
+    """
+    keys = [CHANGED_KEY.format(scope) for scope in scopes]
+    changed = cache.get_many(keys)
+    for key in set(keys) - changed.keys():
+        cache.add(key, time.time(), None)
+        changed[key] = cache.get(key)
+    return max(changed.values())
+
+
+def fragment_key(request, page_obj, *scopes):
+    """Ключ фрагмента ленты: версии областей, страница и пользователь.
+
+    Пользователь входит в ключ, потому что карточки показывают автору
+    ссылку на редактирование.
+    """
+    return ':'.join(
+        str(part) for part in (
+            get_versions(*scopes),
+            page_obj.number,
+            page_obj.cursor,
+            request.user.pk or '',
+        )
+    )
@@ -0,0 +1,167 @@
+"""Чтение с реплик базы данных.
+
+`ReplicaMiddleware` разрешает чтение с реплик на время GET-запроса,
+`ReplicaRouter` направляет такие чтения на одну из реплик
+из `DATABASE_REPLICAS`, а все записи - на `default`.
+
+После записи пользователь на `REPLICA_PIN_SECONDS` закрепляется
+за основной базой (cookie), чтобы сразу увидеть свои изменения:
+например, профиль после `post_create`. Реплика, отставшая больше
+чем на `REPLICA_MAX_LAG` секунд, не используется. Отставание
+измеряется по строке `ReplicaHeartbeat`, которую обновляет в основной
+базе тот, кто обновляет реплики (для копий SQLite - `sync_replicas`).
+Кэшируемые страницы вызывают `ensure_fresh`: реплика, не видевшая
+последних изменений их областей кэша, для них не используется.
+"""
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .cache import last_modified
+from .models import ReplicaHeartbeat
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# как часто процесс перечитывает отметку времени реплики, секунд
+HEARTBEAT_CHECK_INTERVAL = 1
+
+state = threading.local()
+heartbeats = {}
+
+
+def read_heartbeat(alias):
+    try:
+        return (
+            ReplicaHeartbeat.objects.using(alias)
+            .values_list('beat', flat=True)
+            .first()
+        )
+    except DatabaseError:
+        return None
+
+
+def replica_lag(alias):
+    """Отставание реплики в секундах; None, если неизвестно."""
+    now = time.time()
+    checked, beat = heartbeats.get(alias, (0, None))
+    if now - checked > HEARTBEAT_CHECK_INTERVAL:
+        beat = read_heartbeat(alias)
+        heartbeats[alias] = (now, beat)
+    return None if beat is None else now - beat
+
+
+def beat():
+    """Обновляет отметку времени в основной базе; возвращает её."""
+    now = time.time()
+    ReplicaHeartbeat.objects.update_or_create(pk=1, defaults={'beat': now})
+    return now
+
+
+def fresh_replicas():
+    replicas = []
+    for alias in settings.DATABASE_REPLICAS:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            replicas.append(alias)
+    return replicas
+
+
+def choose_replica():
+    """Реплика текущего запроса; выбирается один раз за запрос."""
+    if not hasattr(state, 'replica'):
+        replicas = fresh_replicas()
+        state.replica = random.choice(replicas) if replicas else None
+    return state.replica
+
+
+def ensure_fresh(*scopes):
+    """Переводит чтения запроса на основную базу, если реплика
+    старше последнего изменения областей кэша `scopes`.
+
+    Версии областей меняются в основной базе сразу, поэтому
+    страница из старых данных реплики легла бы в кэш и в ETag
+    под новыми версиями. Вызывается до первого чтения страницы.
+    """
+    if not getattr(state, 'use_replica', False) or not scopes:
+        return
+    replica = choose_replica()
+    if replica is None:
+        return
+    beat = heartbeats.get(replica, (0, None))[1]
+    if beat is None or beat < last_modified(*scopes):
+        state.use_replica = False
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not getattr(state, 'use_replica', False):
+            return DEFAULT_DB_ALIAS
+        return choose_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # После записи запрос дочитывает данные из основной базы.
+        state.wrote = True
+        state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state.use_replica = (
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+        )
+        state.wrote = False
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = state.wrote
+            state.__dict__.clear()
+        if wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+def copy_database(target, alias=DEFAULT_DB_ALIAS):
+    """Копирует базу SQLite в файл `target` через backup API."""
+    connection = connections[alias]
+    connection.ensure_connection()
+    destination = sqlite3.connect(target)
+    try:
+        connection.connection.backup(destination)
+    finally:
+        destination.close()
+
+
+def restore_database(source, alias=DEFAULT_DB_ALIAS):
+    """Заменяет содержимое базы SQLite копией из файла `source`."""
+    connection = connections[alias]
+    if connection.in_atomic_block:
+        # backup API ждёт конца транзакции и зависнет.
+        raise RuntimeError('Базу нельзя заменить внутри транзакции')
+    connection.ensure_connection()
+    snapshot = sqlite3.connect(source)
+    try:
+        snapshot.backup(connection.connection)
+    finally:
+        snapshot.close()
@@ -0,0 +1,113 @@
+import hashlib
+import math
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_versions, last_modified
+from .db import ensure_fresh
+
+PAGE_KEY = 'page:{}:{}'
+
+
+def page_scopes(request, scopes, kwargs):
+    """Области кэша страницы; считаются один раз за запрос.
+
+    Если реплика отстаёт от этих областей, страница читается
+    из основной базы.
+    """
+    if not hasattr(request, '_page_scopes'):
+        request._page_scopes = scopes(**kwargs)
+        if request._page_scopes:
+            ensure_fresh(*request._page_scopes)
+    return request._page_scopes
+
+
+def conditional_page(scopes):
+    """Отвечает 304 на повторный GET, если страница не изменилась.
+
+    ETag складывается из версий областей кэша, адреса страницы
+    и пользователя, Last-Modified - время последнего изменения
+    областей. Для авторизованного пользователя добавляется область
+    его подписок. Проверка не выполняет запросов страницы и не
+    рендерит шаблон.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            found = page_scopes(request, scopes, kwargs)
+            if not found:
+                return view(request, *args, **kwargs)
+            validated = list(found)
+            if request.user.is_authenticated:
+                validated.append(f'follows:{request.user.pk}')
+            etag = quote_etag(hashlib.md5(':'.join((
+                get_versions(*validated),
+                request.get_full_path(),
+                str(request.user.pk or ''),
+                request.META.get('CSRF_COOKIE', ''),
+            )).encode()).hexdigest())
+            modified = math.ceil(last_modified(*validated))
+            response = get_conditional_response(
+                request, etag=etag, last_modified=modified
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(modified)
+                # Клиент хранит страницу, но проверяет её при каждом
+                # показе; страницы пользователя не кладутся в общие кэши.
+                if request.user.is_authenticated:
+                    patch_cache_control(response, no_cache=True, private=True)
+                else:
+                    patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def cache_anonymous(scopes):
+    """Кэширует страницу целиком для анонимных пользователей.
+
+    `scopes(**kwargs)` по аргументам URL возвращает области кэша,
+    данные которых показаны на странице; ключ включает их версии,
+    поэтому любая запись сбрасывает страницу. Если областей нет
+    (например, объект не найден), страница не кэшируется.
+    Авторизованные пользователи всегда получают свежую страницу.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = settings.PAGE_CACHE_TIMEOUT
+            if (
+                not timeout
+                or request.method != 'GET'
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            found = page_scopes(request, scopes, kwargs)
+            if not found:
+                return view(request, *args, **kwargs)
+            path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = PAGE_KEY.format(path, get_versions(*found))
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    timeout
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+from core import queue
+
+
+def run_task(task):
+    # У каждого потока своё соединение с базой: закрываем его
+    # до и после задачи, как это делает обработчик запросов.
+    close_old_connections()
+    try:
+        return queue.run(task)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди пулом потоков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.JOB_WORKERS,
+            help='Сколько задач выполнять одновременно.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('jobs')
+        workers = options['workers']
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while True:
+                    tasks = queue.claim(workers * 2)
+                    if not tasks:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    if workers == 1:
+                        results = map(run_task, tasks)
+                    else:
+                        results = pool.map(run_task, tasks)
+                    for ok in results:
+                        done += ok
+                        failed += not ok
+            except KeyboardInterrupt:
+                self.stdout.write('Остановка по сигналу')
+        self.stdout.write(f'Выполнено задач: {done}, с ошибкой: {failed}')
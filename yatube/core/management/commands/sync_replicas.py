@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import beat, copy_database
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную базу SQLite в файлы реплик.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            self.stdout.write('Реплики не настроены (YATUBE_DB_REPLICAS)')
+            return
+        while True:
+            beat()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(settings.DATABASES[alias]['NAME'])
+                self.stdout.write(f'{alias}: скопирована')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from core.models import TemplateTiming
+
+ORDERINGS = {
+    'own': F('own').desc(),
+    'total': F('total').desc(),
+    'calls': F('calls').desc(),
+    'avg': (F('total') / F('calls')).desc(),
+}
+
+
+class Command(BaseCommand):
+    help = ('Печатает шаблоны и include по времени рендеринга, '
+            'собранному профилировщиком шаблонов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort', choices=ORDERINGS, default='own',
+            help='Порядок: собственное время, полное, вызовы или среднее.'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=30,
+            help='Сколько строк показать.'
+        )
+        parser.add_argument(
+            '--kind', choices=[kind for kind, _ in TemplateTiming.KINDS],
+            help='Только шаблоны или только include.'
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Удалить накопленные данные.'
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            deleted, _ = TemplateTiming.objects.all().delete()
+            self.stdout.write(f'Удалено записей: {deleted}')
+            return
+        timings = TemplateTiming.objects.filter(calls__gt=0)
+        if options['kind']:
+            timings = timings.filter(kind=options['kind'])
+        timings = timings.order_by(ORDERINGS[options['sort']])
+        rows = list(timings[:options['limit']])
+        if not rows:
+            self.stdout.write(
+                'Данных нет: включите TEMPLATE_PROFILER '
+                '(YATUBE_TEMPLATE_PROFILER=1) и откройте страницы'
+            )
+            return
+        all_own = sum(
+            TemplateTiming.objects.values_list('own', flat=True)
+        ) or 1
+        self.stdout.write(
+            f'{"собств., мс":>12} {"доля":>6} {"всего, мс":>11} '
+            f'{"вызовов":>8} {"среднее, мс":>12}  шаблон'
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row.own * 1000:12.1f} {row.own / all_own:6.1%} '
+                f'{row.total * 1000:11.1f} {row.calls:8d} '
+                f'{row.total / row.calls * 1000:12.3f}  {row.name}'
+            )
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_replica_heartbeat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TemplateTiming',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Шаблон или узел')),
+                ('kind', models.CharField(choices=[('template', 'Шаблон'), ('include', 'Include')], max_length=10, verbose_name='Вид')),
+                ('calls', models.BigIntegerField(default=0, verbose_name='Вызовов')),
+                ('total', models.FloatField(default=0, verbose_name='Всего, секунд')),
+                ('own', models.FloatField(default=0, verbose_name='Без вложенных, секунд')),
+            ],
+        ),
+    ]
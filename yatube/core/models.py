@@ -12,3 +12,78 @@ class CreatedModel(models.Model):
     class Meta:
         abstract = True
         ordering = ('-created', )
+
+
+class Job(CreatedModel):
+    """Отложенная задача в очереди `core.queue`.
+
+    Выполненные задачи удаляются, в таблице остаются ожидающие,
+    выполняемые и исчерпавшие попытки.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+    name = models.CharField('Задача', max_length=200)
+    args = models.TextField('Аргументы', default='[]')
+    status = models.CharField(
+        'Состояние', max_length=10, choices=STATUSES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveIntegerField('Попыток не больше', default=5)
+    run_at = models.DateTimeField('Выполнить после')
+    locked_at = models.DateTimeField('Взята в работу', blank=True, null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('run_at', 'id')
+        indexes = [
+            models.Index(
+                fields=('status', 'run_at'), name='job_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} [{self.status}]'
+
+
+class StoredFile(models.Model):
+    """Число ссылок на файл в `ContentAddressedStorage`."""
+    name = models.CharField('Путь', max_length=255, primary_key=True)
+    refs = models.PositiveIntegerField('Ссылок', default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.refs}'
+
+
+class ReplicaHeartbeat(models.Model):
+    """Отметка времени, по которой измеряется отставание реплик.
+
+    Обновляется в основной базе перед копированием; в реплике
+    остаётся время, по состоянию на которое она актуальна.
+    """
+    beat = models.FloatField('Время, секунды Unix', default=0)
+
+
+class TemplateTiming(models.Model):
+    """Накопленное время рендеринга шаблона или `{% include %}`.
+
+    Заполняется профилировщиком `core.template_profiler`.
+    """
+    TEMPLATE = 'template'
+    INCLUDE = 'include'
+    KINDS = (
+        (TEMPLATE, 'Шаблон'),
+        (INCLUDE, 'Include'),
+    )
+    name = models.CharField('Шаблон или узел', max_length=255, unique=True)
+    kind = models.CharField('Вид', max_length=10, choices=KINDS)
+    calls = models.BigIntegerField('Вызовов', default=0)
+    total = models.FloatField('Всего, секунд', default=0)
+    own = models.FloatField('Без вложенных, секунд', default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.calls}'
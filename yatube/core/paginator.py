@@ -0,0 +1,179 @@
+import base64
+import heapq
+from itertools import islice
+from operator import itemgetter
+
+from django.core.paginator import Paginator
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(key):
+    """Кодирует ключ (created, id) в токен для URL."""
+    value, pk = key
+    value = value.isoformat() if hasattr(value, 'isoformat') else repr(value)
+    raw = f'{value}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, parse=parse_datetime):
+    """Разбирает токен курсора. Для битого токена возвращает None."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        value, pk = raw.decode().split('|')
+        value, pk = parse(value), int(pk)
+    except ValueError:
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу (created, id) без OFFSET и COUNT(*).
+
+    Страница выбирается диапазоном по индексу `created` от курсора,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    Общее число страниц неизвестно: `num_pages` описывает только
+    окно вокруг текущей страницы (предыдущая, текущая, следующая).
+    """
+    parse_key = staticmethod(parse_datetime)
+
+    def __init__(self, object_list, per_page, descending=True,
+                 key=('created', 'id')):
+        self.descending = descending
+        self.key = key
+        direction = '-' if descending else ''
+        super().__init__(
+            object_list.order_by(*(f'{direction}{field}' for field in key)),
+            per_page
+        )
+        self.window = 1
+
+    @property
+    def num_pages(self):
+        return self.window
+
+    def _seek(self, cursor, descending):
+        queryset = self.object_list
+        if descending != self.descending:
+            queryset = queryset.reverse()
+        if cursor is None:
+            return queryset
+        created, pk = cursor
+        first, second = self.key
+        if descending:
+            return (
+                queryset
+                .filter(**{f'{first}__lte': created})
+                .exclude(**{first: created, f'{second}__gte': pk})
+            )
+        return (
+            queryset
+            .filter(**{f'{first}__gte': created})
+            .exclude(**{first: created, f'{second}__lte': pk})
+        )
+
+    def fetch(self, cursor, descending, stop, start=0):
+        """Пары (ключ, объект) с `start` по `stop` за курсором."""
+        return [
+            (tuple(getattr(obj, field) for field in self.key), obj)
+            for obj in self._seek(cursor, descending)[start:stop]
+        ]
+
+    def get_page(self, number=None, after=None, before=None):
+        """Страница после `after`, до `before` или, для старых ссылок
+        вида ?page=N, по номеру."""
+        after = decode_cursor(after, self.parse_key)
+        before = decode_cursor(before, self.parse_key)
+        size = self.per_page
+        if before is not None:
+            rows = self.fetch(before, not self.descending, size + 1)
+            has_previous = len(rows) > size
+            rows = rows[:size][::-1]
+            has_next = bool(rows)
+            number = 2 if has_previous else 1
+        elif after is not None:
+            rows = self.fetch(after, self.descending, size + 1)
+            has_next = len(rows) > size
+            rows = rows[:size]
+            has_previous = True
+            number = 2
+        else:
+            try:
+                number = max(int(number), 1)
+            except (TypeError, ValueError):
+                number = 1
+            offset = (number - 1) * size
+            rows = self.fetch(
+                None, self.descending, offset + size + 1, start=offset
+            )
+            has_next = len(rows) > size
+            rows = rows[:size]
+            has_previous = number > 1 and bool(rows)
+        self.window = number + has_next
+        page = self._get_page([obj for _, obj in rows], number, self)
+        page.next_cursor = encode_cursor(rows[-1][0]) if has_next else ''
+        page.previous_cursor = (
+            encode_cursor(rows[0][0]) if has_previous else ''
+        )
+        return page
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """Сливает несколько курсорных пагинаторов с общим ключом.
+
+    Каждый источник читается своим диапазоном по индексу, результаты
+    объединяются слиянием отсортированных списков.
+    """
+
+    def __init__(self, paginators, per_page, descending=True):
+        self.paginators = paginators
+        self.descending = descending
+        Paginator.__init__(self, [], per_page)
+        self.window = 1
+
+    def fetch(self, cursor, descending, stop, start=0):
+        merged = heapq.merge(
+            *(
+                paginator.fetch(cursor, descending, stop)
+                for paginator in self.paginators
+            ),
+            key=itemgetter(0),
+            reverse=descending,
+        )
+        return list(islice(merged, start, stop))
+
+
+def cursor_page(request, paginator):
+    """Страница курсорной пагинации по параметрам запроса.
+
+    В `page.cursor` кладётся курсор запроса (для ключей кэша),
+    в `page.base_query` - остальные GET-параметры для ссылок.
+    """
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    page = paginator.get_page(
+        number=request.GET.get('page'),
+        after=after,
+        before=before,
+    )
+    if after:
+        page.cursor = f'after:{after}'
+    elif before:
+        page.cursor = f'before:{before}'
+    else:
+        page.cursor = ''
+    params = request.GET.copy()
+    for key in ('page', 'after', 'before'):
+        params.pop(key, None)
+    page.base_query = f'{params.urlencode()}&' if params else ''
+    return page
+
+
+def get_cursor_page(request, queryset, per_page, descending=True):
+    """Курсорная страница выборки `queryset`."""
+    return cursor_page(
+        request, CursorPaginator(queryset, per_page, descending)
+    )
@@ -0,0 +1,125 @@
+"""Учёт SQL-запросов представлений и бюджеты на их число.
+
+`QueryBudgetMiddleware` записывает для каждого запроса число
+SQL-запросов, их суммарное время и запросы, повторённые много раз
+с разными параметрами (признак N+1). Бюджет объявляется на
+представлении декоратором `query_budget`; превышение пишется в лог
+`core.queries` и отправляется сигналом `budget_exceeded`, на который
+подписываются тесты (`collect_violations`).
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+budget_exceeded = Signal(providing_args=['view_name', 'stats', 'problems'])
+
+
+def query_budget(queries, repeats=None):
+    """Бюджет представления: не больше `queries` запросов,
+    один и тот же запрос - не больше `repeats` раз."""
+    def decorator(view):
+        view.query_budget = {'queries': queries, 'repeats': repeats}
+        return view
+    return decorator
+
+
+class QueryStats:
+    """Запросы к базе за время работы `record`."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        # Параметры передаются отдельно, поэтому текст запроса
+        # уже не содержит значений и служит отпечатком.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[sql] += 1
+
+    def repeated(self, threshold):
+        return {
+            sql: count for sql, count in self.fingerprints.items()
+            if count >= threshold
+        }
+
+    @contextmanager
+    def record(self):
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+
+def check_budget(budget, stats):
+    """Список нарушений бюджета; пустой, если бюджет соблюдён."""
+    problems = []
+    if stats.count > budget['queries']:
+        problems.append(
+            f'запросов {stats.count}, бюджет {budget["queries"]}'
+        )
+    repeats = budget['repeats']
+    if repeats is None:
+        repeats = settings.QUERY_MAX_REPEATS
+    for sql, count in stats.repeated(repeats + 1).items():
+        problems.append(f'N+1: {count} раз {sql[:200]}')
+    return problems
+
+
+class QueryBudgetMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with stats.record():
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is None:
+            return response
+        request.query_stats = stats
+        logger.debug(
+            '%s: запросов %d, %.1f мс', match.view_name, stats.count,
+            stats.duration * 1000
+        )
+        budget = getattr(match.func, 'query_budget', None)
+        if budget is not None:
+            problems = check_budget(budget, stats)
+            if problems:
+                logger.warning(
+                    'Бюджет запросов %s превышен: %s', match.view_name,
+                    '; '.join(problems)
+                )
+                budget_exceeded.send(
+                    sender=self.__class__, view_name=match.view_name,
+                    stats=stats, problems=problems
+                )
+        return response
+
+
+@contextmanager
+def collect_violations():
+    """Собирает превышения бюджетов внутри блока в список."""
+    violations = []
+
+    def receiver(sender, view_name, problems, **kwargs):
+        violations.append(f'{view_name}: {"; ".join(problems)}')
+
+    budget_exceeded.connect(receiver, weak=False)
+    try:
+        yield violations
+    finally:
+        budget_exceeded.disconnect(receiver)
@@ -0,0 +1,104 @@
+"""Очередь фоновых задач в базе данных.
+
+Задача - функция, помеченная `@job` в модуле `jobs` приложения.
+`enqueue` записывает вызов в таблицу `core_job` в той же транзакции,
+что и данные запроса, поэтому задачи переживают перезапуск.
+Выполняет их команда `run_jobs`. Упавшая задача повторяется
+с экспоненциальной задержкой, пока не исчерпает попытки.
+"""
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def job(func):
+    """Регистрирует функцию как задачу очереди."""
+    registry[f'{func.__module__}.{func.__name__}'] = func
+    return func
+
+
+def enqueue(func, *args, countdown=0, max_attempts=None):
+    """Ставит вызов `func(*args)` в очередь; аргументы - JSON."""
+    return Job.objects.create(
+        name=f'{func.__module__}.{func.__name__}',
+        args=json.dumps(args),
+        run_at=timezone.now() + timedelta(seconds=countdown),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(limit):
+    """Забирает до `limit` готовых задач.
+
+    Задача достаётся тому, чей условный UPDATE сменил её состояние,
+    поэтому несколько воркеров не выполнят её дважды. Задачи,
+    зависшие в работе дольше `JOB_LOCK_TIMEOUT`, возвращаются
+    в очередь: их воркер, скорее всего, остановлен.
+    """
+    now = timezone.now()
+    Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    ).update(status=Job.QUEUED)
+    candidates = (
+        Job.objects
+        .filter(status=Job.QUEUED, run_at__lte=now)
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed = [
+        pk for pk in list(candidates)
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+    ]
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def backoff(attempts):
+    return timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run(task):
+    """Выполняет задачу; при ошибке планирует повтор."""
+    try:
+        func = registry.get(task.name)
+        if func is None:
+            raise LookupError(f'Задача {task.name} не зарегистрирована')
+        func(*json.loads(task.args))
+    except Exception:
+        logger.exception('Задача %s упала', task)
+        retry = func is not None and task.attempts < task.max_attempts
+        Job.objects.filter(pk=task.pk).update(
+            status=Job.QUEUED if retry else Job.FAILED,
+            run_at=timezone.now() + backoff(task.attempts),
+            locked_at=None,
+            last_error=traceback.format_exc(),
+        )
+        return False
+    Job.objects.filter(pk=task.pk).delete()
+    return True
+
+
+def run_pending(limit=100):
+    """Выполняет готовые задачи в текущем потоке; возвращает их число."""
+    autodiscover_modules('jobs')
+    total = 0
+    while True:
+        tasks = claim(limit)
+        if not tasks:
+            return total
+        for task in tasks:
+            run(task)
+        total += len(tasks)
@@ -0,0 +1,45 @@
+"""Настройка соединений SQLite.
+
+При каждом новом соединении выполняются PRAGMA из `SQLITE_PRAGMAS`
+(или из ключа `PRAGMAS` настроек конкретной базы). WAL позволяет
+читать во время записи, `synchronous=NORMAL` в режиме WAL не теряет
+целостность при сбое процесса, а `busy_timeout` заставляет писателя
+подождать блокировку вместо немедленной ошибки `database is locked`.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+def pragmas_for(connection):
+    return connection.settings_dict.get('PRAGMAS', settings.SQLITE_PRAGMAS)
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(pragmas_for(connection))
+    journal_mode = pragmas.pop('journal_mode', None)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if journal_mode is None:
+            return
+        # Режим журнала хранится в файле базы. Смена требует
+        # монопольной блокировки, поэтому выполняется, только если
+        # режим другой, а не при каждом соединении.
+        cursor.execute('PRAGMA journal_mode')
+        if cursor.fetchone()[0].lower() != journal_mode.lower():
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+
+
+def current_pragmas(connection, names):
+    """Значения PRAGMA в открытом соединении, для проверки и отчётов."""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            values[name] = cursor.fetchone()[0]
+    return values
+
+
+connection_created.connect(apply_pragmas)
@@ -0,0 +1,91 @@
+"""Файловое хранилище с адресацией по содержимому.
+
+Файл сохраняется под именем `<каталог>/ab/cd/<sha256>.<расширение>`:
+одинаковые загрузки хранятся один раз, а два уровня каталогов
+по 256 вариантов держат каталоги маленькими при миллионах файлов.
+Ссылки на файл считаются в `StoredFile`; `release` удаляет файл,
+когда ссылок не осталось.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+from .models import StoredFile
+
+# Временные файлы загрузок. В базе на них нет ссылок, поэтому
+# `gc_media` удаляет их как сирот, когда они старше `--grace-hours`:
+# так убираются остатки прерванных загрузок.
+TEMP_PREFIX = '.upload-'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def hashed_name(self, name, digest):
+        """Путь файла с хешем `digest`, загруженного под именем `name`."""
+        directory, filename = posixpath.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], f'{digest}{ext}'
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в `_save`: совпадение имён
+        # означает совпадение файлов, суффиксы не нужны.
+        return name
+
+    def _save(self, name, content):
+        directory = self.path(posixpath.dirname(name))
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        handle, temp_path = tempfile.mkstemp(
+            prefix=TEMP_PREFIX, dir=directory
+        )
+        try:
+            with os.fdopen(handle, 'wb') as temp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+            name = self.hashed_name(name, digest.hexdigest())
+            path = self.path(name)
+            with transaction.atomic():
+                StoredFile.objects.get_or_create(name=name)
+                StoredFile.objects.filter(name=name).update(
+                    refs=F('refs') + 1
+                )
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(temp_path, path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(path, self.file_permissions_mode)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def release(self, name):
+        """Снимает ссылку на файл и удаляет его, если ссылок не осталось.
+
+        Файлы без учёта ссылок (загруженные до этого хранилища)
+        не удаляются: их убирает `gc_media`.
+        """
+        if not name:
+            return
+        with transaction.atomic():
+            StoredFile.objects.filter(name=name, refs__gt=0).update(
+                refs=F('refs') - 1
+            )
+            deleted, _ = StoredFile.objects.filter(name=name, refs=0).delete()
+            if deleted:
+                self.delete(name)
+
+
+content_storage = ContentAddressedStorage()
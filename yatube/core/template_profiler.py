@@ -0,0 +1,115 @@
+"""Профилировщик рендеринга шаблонов.
+
+Включается настройкой `TEMPLATE_PROFILER`: тогда `install` оборачивает
+`Template._render` и `IncludeNode.render` и для каждого шаблона
+и каждого `{% include %}` (по месту в родительском шаблоне) считает
+вызовы, полное время и собственное время без вложенных шаблонов.
+Счётчики копятся в памяти процесса и не чаще раза в
+`TEMPLATE_PROFILER_FLUSH` секунд по окончании запроса добавляются
+в `TemplateTiming`, поэтому складываются по всем запросам и процессам.
+Отчёт печатает команда `template_profile`.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models import F
+from django.template.base import Template
+from django.template.loader_tags import IncludeNode
+
+from .models import TemplateTiming
+
+local = threading.local()
+lock = threading.Lock()
+# имя -> [вид, вызовы, полное время, собственное время]
+pending = {}
+originals = {}
+last_flush = 0.0
+
+
+def measure(name, kind, render, *args):
+    stack = local.__dict__.setdefault('stack', [])
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        return render(*args)
+    finally:
+        elapsed = time.perf_counter() - started
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with lock:
+            counters = pending.setdefault(name, [kind, 0, 0.0, 0.0])
+            counters[1] += 1
+            counters[2] += elapsed
+            counters[3] += elapsed - children
+
+
+def include_name(node):
+    """`шаблон:строка {% include ... %}` - место узла в шаблоне."""
+    origin = getattr(node, 'origin', None)
+    token = getattr(node, 'token', None)
+    template = getattr(origin, 'template_name', None) or '<string>'
+    if token is None:
+        return f'{template} include'
+    return f'{template}:{token.lineno} {token.contents}'
+
+
+def profiled_render(self, context):
+    return measure(
+        self.name or '<string>', TemplateTiming.TEMPLATE,
+        originals['template'], self, context
+    )
+
+
+def profiled_include(self, context):
+    return measure(
+        include_name(self), TemplateTiming.INCLUDE,
+        originals['include'], self, context
+    )
+
+
+def flush(force=False, **kwargs):
+    """Переносит накопленные счётчики в базу."""
+    global last_flush
+    now = time.monotonic()
+    if not force and now - last_flush < settings.TEMPLATE_PROFILER_FLUSH:
+        return
+    with lock:
+        batch = dict(pending)
+        pending.clear()
+        last_flush = now
+    if not batch:
+        return
+    with transaction.atomic():
+        for name, (kind, calls, total, own) in batch.items():
+            TemplateTiming.objects.get_or_create(
+                name=name[:255], defaults={'kind': kind}
+            )
+            TemplateTiming.objects.filter(name=name[:255]).update(
+                calls=F('calls') + calls,
+                total=F('total') + total,
+                own=F('own') + own,
+            )
+
+
+def install():
+    if originals:
+        return
+    originals['template'] = Template._render
+    originals['include'] = IncludeNode.render
+    Template._render = profiled_render
+    IncludeNode.render = profiled_include
+    request_finished.connect(flush)
+
+
+def uninstall():
+    if not originals:
+        return
+    Template._render = originals.pop('template')
+    IncludeNode.render = originals.pop('include')
+    request_finished.disconnect(flush)
+    with lock:
+        pending.clear()
@@ -0,0 +1,186 @@
+"""Время запроса по слоям: база, кэш, шаблоны.
+
+`ServerTimingMiddleware` заводит на время запроса счётчик `Timings`.
+Запросы к базе замеряются через `connection.execute_wrapper`,
+обращения к кэшу - бэкендом с `TimedCacheMixin`, рендеринг - бэкендом
+шаблонов `TimedDjangoTemplates`. Итог уходит в заголовок
+`Server-Timing` и в лог `core.timing`.
+
+Время шаблона включает запросы и обращения к кэшу, выполненные
+во время рендеринга (ленивые QuerySet, `{% cache %}`), поэтому слои
+пересекаются. Вне запроса замеры не делаются: весь учёт - пара
+вызовов `perf_counter` на операцию.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+local = threading.local()
+
+# Метрика Server-Timing -> описание; заголовки только в ASCII.
+METRICS = {
+    'db': 'Database',
+    'cache': 'Cache',
+    'tpl': 'Templates',
+}
+
+
+class Timings:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(METRICS, 0.0)
+        self.counts = dict.fromkeys(METRICS, 0)
+        # Слои, замер которых уже идёт: `get_many` бэкенда вызывает
+        # `get`, и время не должно считаться дважды.
+        self.active = set()
+
+    def add(self, metric, duration):
+        self.durations[metric] += duration
+        self.counts[metric] += 1
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def header(self, total):
+        parts = [
+            f'{metric};dur={self.durations[metric] * 1000:.1f};'
+            f'desc="{METRICS[metric]} ({self.counts[metric]})"'
+            for metric in METRICS
+        ]
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def current():
+    """Счётчик текущего запроса или None."""
+    return getattr(local, 'timings', None)
+
+
+@contextmanager
+def timed(metric):
+    timings = current()
+    if timings is None or metric in timings.active:
+        yield
+        return
+    timings.active.add(metric)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(metric)
+        timings.add(metric, time.perf_counter() - started)
+
+
+def time_query(execute, sql, params, many, context):
+    with timed('db'):
+        return execute(sql, params, many, context)
+
+
+class TimedCacheMixin:
+    """Замеряет обращения к бэкенду кэша."""
+
+    def get(self, *args, **kwargs):
+        with timed('cache'):
+            return super().get(*args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        with timed('cache'):
+            return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        with timed('cache'):
+            return super().add(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with timed('cache'):
+            return super().delete(*args, **kwargs)
+
+    def get_many(self, *args, **kwargs):
+        with timed('cache'):
+            return super().get_many(*args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        with timed('cache'):
+            return super().set_many(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        with timed('cache'):
+            return super().incr(*args, **kwargs)
+
+
+class TimedLocMemCache(TimedCacheMixin, LocMemCache):
+    pass
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        with timed('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DTL, замеряющий рендеринг шаблонов верхнего уровня.
+
+    Подключаемые через `{% include %}` шаблоны входят во время
+    родителя.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class ServerTimingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING:
+            return self.get_response(request)
+        local.timings = timings = Timings()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(time_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            local.timings = None
+        total = timings.total()
+        response['Server-Timing'] = timings.header(total)
+        match = request.resolver_match
+        logger.info(
+            'path=%s view=%s status=%s total_ms=%.1f db_ms=%.1f '
+            'db_queries=%d cache_ms=%.1f cache_calls=%d tpl_ms=%.1f',
+            request.path, match.view_name if match else '-',
+            response.status_code, total * 1000,
+            timings.durations['db'] * 1000, timings.counts['db'],
+            timings.durations['cache'] * 1000, timings.counts['cache'],
+            timings.durations['tpl'] * 1000,
+            extra={
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'total_ms': total * 1000,
+                **{
+                    f'{metric}_ms': duration * 1000
+                    for metric, duration in timings.durations.items()
+                },
+            }
+        )
+        return response
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from .models import Post, Group, Follow, Comment
+from .search import matching_posts
 
 
 @admin.register(Post)
@@ -11,6 +12,9 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('created',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        return matching_posts(queryset, search_term), False
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
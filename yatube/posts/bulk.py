@@ -0,0 +1,73 @@
+"""Массовая загрузка данных в обход сигналов.
+
+`bulk_create` не отправляет сигналы, поэтому после загрузки
+производные данные (ленты, счётчики, поисковый индекс, кэш)
+пересчитываются целиком функцией `rebuild_derived` или только для
+затронутых загрузкой объектов - `rebuild_affected`.
+"""
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from core import cache as core_cache
+from . import search, stats, timeline
+from .models import Follow
+
+
+@contextmanager
+def preserve_created(*models):
+    """Позволяет сохранить заданную дату `created` через `bulk_create`."""
+    fields = [model._meta.get_field('created') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def rebuild_derived(batch_size=1000):
+    """Пересчитывает всё, что обычно поддерживают сигналы."""
+    stats.rebuild_all(batch_size)
+    stats.recount_comments()
+    timeline.rebuild()
+    search.rebuild()
+    cache.clear()
+
+
+def batches(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def rebuild_affected(user_ids, post_ids=(), group_ids=(), batch_size=1000):
+    """Пересчитывает производные данные только затронутых объектов.
+
+    `user_ids` - новые пользователи, авторы новых постов и участники
+    новых подписок, `post_ids` - посты с новыми комментариями.
+    Перестраиваются ленты этих пользователей и их подписчиков,
+    а кэш сбрасывается по областям вместо очистки целиком.
+    """
+    user_ids = set(user_ids)
+    readers = set(user_ids)
+    for batch in batches(user_ids, batch_size):
+        stats.rebuild(batch)
+        search.rebuild(author_ids=batch)
+        readers.update(
+            Follow.objects.filter(author_id__in=batch)
+            .values_list('user_id', flat=True)
+        )
+    for batch in batches(readers, batch_size):
+        timeline.rebuild(user_ids=batch)
+    for batch in batches(post_ids, batch_size):
+        stats.recount_comments(batch)
+    core_cache.bump(
+        'posts', 'groups', 'users',
+        *(f'{scope}:{pk}' for pk in user_ids
+          for scope in ('author', 'stats', 'follows')),
+        *(f'follows:{pk}' for pk in readers - user_ids),
+        *(f'post:{pk}' for pk in post_ids),
+        *(f'group:{pk}' for pk in group_ids),
+    )
@@ -0,0 +1,241 @@
+"""Синтетические данные для замеров производительности.
+
+`generate` создаёт через `bulk_create` миллионы строк с перекосами,
+как на живом сайте: число подписчиков и постов у авторов, комментарии
+к постам и размеры групп распределены по степенному закону (Ципфа),
+а свежих записей больше, чем старых. Тексты собираются из заранее
+сгенерированного Faker набора фраз, иначе Faker оказался бы самой
+медленной частью загрузки.
+
+Готовая база сохраняется снимком (`snapshot_path`); повторный запуск
+с теми же параметрами и миграциями только копирует его в базу.
+"""
+import hashlib
+import itertools
+import json
+import os
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.migrations.loader import MigrationLoader
+from django.utils import timezone
+from faker import Faker
+
+from .bulk import preserve_created, rebuild_derived
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+PASSWORD = 'seed-password'
+PHRASES = 5000
+# Показатель степенного закона: чем больше, тем сильнее перекос.
+SKEW = 1.1
+# Комментарии распределены по постам мягче: иначе один пост
+# собирает десятки тысяч.
+COMMENT_SKEW = 0.7
+# Доля постов вне групп.
+NO_GROUP = 0.3
+
+
+def snapshot_path(directory, counts, random_seed):
+    """Файл снимка для этих параметров и текущих миграций."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    key = json.dumps(
+        {
+            'counts': counts,
+            'seed': random_seed,
+            'migrations': sorted(loader.graph.leaf_nodes()),
+        },
+        sort_keys=True
+    )
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return os.path.join(directory, f'seed-{digest}.sqlite3')
+
+
+def zipf_weights(count, skew=SKEW):
+    """Накопленные веса рангов 1..count по закону Ципфа."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    ))
+
+
+class Generator:
+
+    def __init__(self, rng, batch_size=5000, days=365, progress=None):
+        self.rng = rng
+        self.batch_size = batch_size
+        self.seconds = days * 24 * 60 * 60
+        self.now = timezone.now()
+        self.progress = progress or (lambda message: None)
+        faker = Faker('ru_RU')
+        faker.seed_instance(rng.random())
+        self.phrases = [faker.sentence() for _ in range(PHRASES)]
+        self.names = [faker.user_name() for _ in range(PHRASES)]
+        self.first_names = [faker.first_name() for _ in range(PHRASES)]
+        self.last_names = [faker.last_name() for _ in range(PHRASES)]
+        self.titles = [faker.catch_phrase() for _ in range(PHRASES)]
+
+    def text(self, longest=6):
+        return ' '.join(
+            self.rng.choices(self.phrases, k=self.rng.randint(1, longest))
+        )
+
+    def moment(self):
+        # Квадрат равномерного числа сдвигает даты к настоящему.
+        return self.now - timedelta(
+            seconds=int(self.seconds * self.rng.random() ** 2)
+        )
+
+    def popular(self, population, cum_weights, count):
+        return self.rng.choices(population, cum_weights=cum_weights, k=count)
+
+    def insert(self, model, rows, total, **kwargs):
+        """Записывает строки пачками, не держа их все в памяти."""
+        done = 0
+        started = time.monotonic()
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            # Размер одного INSERT Django подбирает под лимиты SQLite.
+            with transaction.atomic():
+                model.objects.bulk_create(batch, **kwargs)
+            done += len(batch)
+            self.progress(
+                f'{model._meta.model_name}: {done}/{total}, '
+                f'{done / max(time.monotonic() - started, 1e-6):.0f} строк/с'
+            )
+
+    def users(self, count):
+        password = make_password(PASSWORD)
+        rng = self.rng
+        self.insert(User, (
+            User(
+                # Имена Faker бывают с цифрами на конце: номер после
+                # разделителя сам по себе делает имя уникальным.
+                username=f'{rng.choice(self.names)[:100]}_{number}',
+                first_name=rng.choice(self.first_names),
+                last_name=rng.choice(self.last_names),
+                password=password,
+            )
+            for number in range(count)
+        ), count)
+        user_ids = list(
+            User.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        # Популярность не должна совпадать с порядком id.
+        rng.shuffle(user_ids)
+        return user_ids
+
+    def groups(self, count):
+        self.insert(Group, (
+            Group(
+                title=self.titles[number % PHRASES][:200],
+                slug=f'group-{number}',
+                description=self.text(3),
+            )
+            for number in range(count)
+        ), count)
+        return list(
+            Group.objects.order_by('pk').values_list('pk', flat=True)
+        )
+
+    def posts(self, count, user_ids, group_ids):
+        rng = self.rng
+        # Пишут много не обязательно самые читаемые авторы.
+        user_ids = list(user_ids)
+        rng.shuffle(user_ids)
+        author_weights = zipf_weights(len(user_ids))
+        group_weights = zipf_weights(len(group_ids)) if group_ids else None
+        created = []
+
+        def rows():
+            for start in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - start)
+                authors = self.popular(user_ids, author_weights, size)
+                groups = (
+                    self.popular(group_ids, group_weights, size)
+                    if group_ids else [None] * size
+                )
+                for author_id, group_id in zip(authors, groups):
+                    moment = self.moment()
+                    created.append(moment)
+                    yield Post(
+                        author_id=author_id,
+                        group_id=group_id if rng.random() >= NO_GROUP
+                        else None,
+                        text=self.text(), created=moment,
+                    )
+
+        start = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        start = start.first() or 0
+        self.insert(Post, rows(), count)
+        post_ids = list(
+            Post.objects.filter(pk__gt=start).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        return list(zip(post_ids, created))
+
+    def comments(self, count, posts, user_ids):
+        if not posts:
+            return
+        rng = self.rng
+        # Обсуждают немногие посты: перекос по случайному рангу.
+        ranked = list(posts)
+        rng.shuffle(ranked)
+        post_weights = zipf_weights(len(ranked), skew=COMMENT_SKEW)
+        author_weights = zipf_weights(len(user_ids), skew=0.8)
+
+        def rows():
+            for start in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - start)
+                targets = self.popular(ranked, post_weights, size)
+                authors = self.popular(user_ids, author_weights, size)
+                for (post_id, posted), author_id in zip(targets, authors):
+                    delay = (self.now - posted).total_seconds()
+                    yield Comment(
+                        post_id=post_id, author_id=author_id,
+                        text=self.text(2),
+                        created=posted + timedelta(
+                            seconds=int(delay * rng.random() ** 3)
+                        ),
+                    )
+
+        self.insert(Comment, rows(), count)
+
+    def follows(self, count, user_ids):
+        if len(user_ids) < 2:
+            return
+        # Подписчиков у авторов - по степенному закону; повторы
+        # отбрасывает уникальный индекс.
+        author_weights = zipf_weights(len(user_ids))
+
+        def rows():
+            for start in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - start)
+                authors = self.popular(user_ids, author_weights, size)
+                for author_id in authors:
+                    user_id = self.rng.choice(user_ids)
+                    if user_id != author_id:
+                        yield Follow(
+                            user_id=user_id, author_id=author_id,
+                            created=self.moment(),
+                        )
+
+        self.insert(Follow, rows(), count, ignore_conflicts=True)
+
+
+def generate(counts, rng, batch_size=5000, progress=None):
+    """Заполняет базу данными в объёмах из `counts`."""
+    generator = Generator(rng, batch_size, progress=progress)
+    with preserve_created(Post, Comment, Follow):
+        user_ids = generator.users(counts['users'])
+        group_ids = generator.groups(counts['groups'])
+        posts = generator.posts(counts['posts'], user_ids, group_ids)
+        generator.comments(counts['comments'], posts, user_ids)
+        generator.follows(counts['follows'], user_ids)
+    rebuild_derived(batch_size)
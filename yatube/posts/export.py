@@ -0,0 +1,166 @@
+"""Потоковая выгрузка постов и комментариев пользователя.
+
+Строки читаются из базы `iterator()` пачками и сразу отдаются
+генератором, поэтому память не растёт с числом постов автора.
+"""
+import csv
+import json
+import os
+import tarfile
+import tempfile
+
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 500
+# Сколько байт картинки читать за раз при выгрузке в tar.
+FILE_CHUNK_SIZE = 64 * 1024
+FIELDS = ('type', 'id', 'post', 'author', 'group', 'text', 'image', 'created')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'tar': 'application/x-tar',
+}
+
+
+def export_rows(author):
+    """Посты автора, затем его комментарии - словарями с полями FIELDS."""
+    for post in (
+        Post.objects
+        .filter(author=author)
+        .select_related('group')
+        .order_by('pk')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    ):
+        yield {
+            'type': 'post',
+            'id': post.pk,
+            'post': None,
+            'author': author.username,
+            'group': post.group.slug if post.group else None,
+            'text': post.text,
+            'image': post.image.name or None,
+            'created': post.created.isoformat(),
+        }
+    for comment in (
+        Comment.objects
+        .filter(author=author)
+        .order_by('pk')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    ):
+        yield {
+            'type': 'comment',
+            'id': comment.pk,
+            'post': comment.post_id,
+            'author': author.username,
+            'group': None,
+            'text': comment.text,
+            'image': None,
+            'created': comment.created.isoformat(),
+        }
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+class Echo:
+    """Файл для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.DictWriter(Echo(), FIELDS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class TarStream:
+    """Файл для tarfile в потоковом режиме: копит байты до выдачи."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def tar_member(archive, stream, info, fileobj):
+    """Пишет файл в архив частями, выдавая накопленные байты.
+
+    `TarFile.addfile` читает содержимое целиком; здесь заголовок
+    пишется им же, а содержимое - кусками по `FILE_CHUNK_SIZE`
+    с дополнением до блока, как это делает сам tarfile.
+    """
+    archive.addfile(info)
+    left = info.size
+    while left:
+        chunk = fileobj.read(min(FILE_CHUNK_SIZE, left))
+        if not chunk:
+            # Файл стал короче заявленного размера: дополняем нулями,
+            # чтобы не сломать разметку архива.
+            chunk = tarfile.NUL * min(FILE_CHUNK_SIZE, left)
+        archive.fileobj.write(chunk)
+        left -= len(chunk)
+        data = stream.pop()
+        if data:
+            yield data
+    blocks, remainder = divmod(info.size, tarfile.BLOCKSIZE)
+    if remainder:
+        archive.fileobj.write(
+            tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+        )
+        blocks += 1
+    archive.offset += blocks * tarfile.BLOCKSIZE
+
+
+def tar_chunks(author, storage):
+    """Архив с `posts.jsonl` и картинками постов автора.
+
+    Размер файла в tar записывается перед содержимым, поэтому
+    JSONL сначала пишется во временный файл на диске. Картинки
+    отдаются кусками, их размер берётся из хранилища.
+    """
+    stream = TarStream()
+    with tempfile.TemporaryFile() as data, \
+            tarfile.open(fileobj=stream, mode='w|') as archive:
+        for line in jsonl_lines(export_rows(author)):
+            data.write(line.encode())
+        info = tarfile.TarInfo('posts.jsonl')
+        info.size = data.tell()
+        data.seek(0)
+        yield from tar_member(archive, stream, info, data)
+        for name in (
+            Post.objects
+            .filter(author=author)
+            .exclude(image='')
+            .exclude(image=None)
+            .order_by('pk')
+            .values_list('image', flat=True)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        ):
+            if not storage.exists(name):
+                continue
+            info = tarfile.TarInfo(os.path.join('media', name))
+            info.size = storage.size(name)
+            with storage.open(name) as image:
+                yield from tar_member(archive, stream, info, image)
+    yield stream.pop()
+
+
+def export_chunks(author, export_format, storage=None):
+    """Поток частей выгрузки в заданном формате."""
+    if export_format == 'tar':
+        return tar_chunks(author, storage)
+    if export_format == 'csv':
+        return csv_lines(export_rows(author))
+    return jsonl_lines(export_rows(author))
@@ -0,0 +1,111 @@
+"""RSS- и Atom-ленты постов: общая, группы и автора.
+
+Ленты строятся на тех же запросах, что и страницы, и оборачиваются
+теми же декораторами: XML кэшируется по версиям областей кэша,
+а повторный запрос с ETag или Last-Modified получает 304.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from core.decorators import cache_anonymous, conditional_page
+from .models import Group
+from .views import (
+    group_page_scopes, index_page_scopes, post_list, profile_page_scopes
+)
+
+User = get_user_model()
+
+
+class PostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Последние обновления на сайте'
+
+    def link(self, obj=None):
+        return reverse('posts:index')
+
+    def filters(self, obj):
+        return {}
+
+    def items(self, obj=None):
+        return post_list(**self.filters(obj)).order_by(
+            '-created', '-id'
+        )[:settings.SYNDICATION_ITEMS]
+
+    def item_title(self, item):
+        return item.text[:50]
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.created
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(PostsFeed):
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: записи сообщества {obj}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', kwargs={'slug': obj.slug})
+
+    def filters(self, obj):
+        return {'group': obj}
+
+
+class AuthorPostsFeed(PostsFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Записи пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', kwargs={'username': obj.username})
+
+    def filters(self, obj):
+        return {'author': obj}
+
+
+def atom(feed_class):
+    """Та же лента в формате Atom."""
+    return type(
+        f'Atom{feed_class.__name__}',
+        (feed_class, ),
+        {'feed_type': Atom1Feed, 'subtitle': feed_class.description}
+    )
+
+
+def cached_feed(feed, scopes):
+    return conditional_page(scopes)(cache_anonymous(scopes)(feed))
+
+
+index_rss = cached_feed(PostsFeed(), index_page_scopes)
+index_atom = cached_feed(atom(PostsFeed)(), index_page_scopes)
+group_rss = cached_feed(GroupPostsFeed(), group_page_scopes)
+group_atom = cached_feed(atom(GroupPostsFeed)(), group_page_scopes)
+author_rss = cached_feed(AuthorPostsFeed(), profile_page_scopes)
+author_atom = cached_feed(atom(AuthorPostsFeed)(), profile_page_scopes)
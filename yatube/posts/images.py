@@ -0,0 +1,55 @@
+"""Уменьшенные копии картинок постов.
+
+Копии создаются один раз при сохранении картинки через
+`sorl.thumbnail`; их адреса и размеры хранятся в поле
+`Post.image_variants`, поэтому шаблоны выводят `srcset`,
+`width` и `height` без обращения к файлам.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from PIL import features
+from sorl.thumbnail import get_thumbnail
+
+# WebP доступен, только если Pillow собран с libwebp.
+FORMATS = ('JPEG', 'WEBP') if features.check('webp') else ('JPEG', )
+
+
+def image_exists(image):
+    try:
+        return bool(image) and image.storage.exists(image.name)
+    except SuspiciousFileOperation:
+        return False
+
+
+def make_variants(image):
+    """Описание копий картинки; пустое, если её не удалось прочитать."""
+    if not image_exists(image):
+        return {}
+    variants = {}
+    for size, geometry in settings.POST_IMAGE_VARIANTS.items():
+        variants[size] = {}
+        for image_format in FORMATS:
+            thumbnail = get_thumbnail(
+                image, geometry,
+                format=image_format, upscale=False,
+                quality=settings.POST_IMAGE_QUALITY,
+            )
+            if not thumbnail.exists():
+                return {}
+            variants[size][image_format.lower()] = {
+                'url': thumbnail.url,
+                'width': thumbnail.width,
+                'height': thumbnail.height,
+            }
+    return variants
+
+
+def build_variants(post):
+    """Создаёт копии картинки поста и сохраняет их описание."""
+    variants = make_variants(post.image)
+    image_variants = json.dumps(variants) if variants else ''
+    if image_variants != post.image_variants:
+        post.image_variants = image_variants
+        post.save(update_fields=['image_variants'])
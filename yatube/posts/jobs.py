@@ -0,0 +1,11 @@
+"""Фоновые задачи приложения posts."""
+from core.queue import job
+from . import images
+from .models import Post
+
+
+@job
+def build_image_variants(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        images.build_variants(post)
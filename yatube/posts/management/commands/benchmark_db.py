@@ -0,0 +1,222 @@
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connection, connections
+)
+from django.test import Client
+from django.urls import reverse
+
+from core.sqlite import current_pragmas
+from posts.management.commands.seed import COUNTS
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+BENCH_USERNAME = 'benchmark_db'
+# Адрес не из INTERNAL_IPS, чтобы не включалась панель отладки.
+REMOTE_ADDR = '192.0.2.1'
+# Настройки соединения в каждой фазе. Базовая - поведение SQLite
+# по умолчанию: журнал отката, полная синхронизация и без ожидания
+# блокировки (иначе модуль sqlite3 сам ждёт её до 5 секунд, и ошибок
+# database is locked почти не бывает).
+PHASES = {
+    'baseline': {
+        'PRAGMAS': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {'timeout': 0},
+    },
+    'tuned': {
+        'PRAGMAS': settings.SQLITE_PRAGMAS,
+        'CONN_MAX_AGE': settings.DATABASES[DEFAULT_DB_ALIAS].get(
+            'CONN_MAX_AGE', 0
+        ),
+        'OPTIONS': settings.DATABASES[DEFAULT_DB_ALIAS].get('OPTIONS', {}),
+    },
+}
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = self.writes = self.locked = self.errors = 0
+        self.timings = []
+
+    def add(self, kind, started):
+        with self.lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+            self.timings.append(time.perf_counter() - started)
+
+    def percentile(self, share):
+        timings = sorted(self.timings)
+        if not timings:
+            return 0
+        # ближайший ранг: наименьшее значение, не меньше которого
+        # доля `share` замеров
+        return timings[max(math.ceil(len(timings) * share) - 1, 0)]
+
+
+def worker(user, posts, usernames, deadline, write, stats):
+    client = Client(REMOTE_ADDR=REMOTE_ADDR)
+    client.force_login(user)
+    try:
+        while time.monotonic() < deadline:
+            post_id = random.choice(posts)
+            started = time.perf_counter()
+            try:
+                if write:
+                    response = client.post(
+                        reverse('posts:add_comment',
+                                kwargs={'post_id': post_id}),
+                        {'text': 'benchmark'}
+                    )
+                else:
+                    response = client.get(random.choice((
+                        reverse('posts:index'),
+                        reverse('posts:post_detail',
+                                kwargs={'post_id': post_id}),
+                        reverse('posts:profile',
+                                kwargs={'username': random.choice(usernames)}),
+                    )))
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                stats.add('locked', started)
+                continue
+            if response.status_code >= 500:
+                stats.add('errors', started)
+            else:
+                stats.add('writes' if write else 'reads', started)
+    finally:
+        # У потока своё соединение: без закрытия следующая фаза
+        # не сможет сменить режим журнала.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = ('Нагружает представления параллельным чтением и записью '
+            'и сравнивает настройки SQLite по умолчанию с SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Сколько клиентов работает одновременно.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Сколько из них пишут комментарии.'
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=10,
+            help='Длительность каждой фазы.'
+        )
+        parser.add_argument(
+            '--phase', choices=[*PHASES, 'both'], default='both',
+            help='Какие настройки проверить.'
+        )
+        parser.add_argument(
+            '--snapshot', action='store_true',
+            help='Заменить данные в базе снимком seed перед замером.'
+        )
+        parser.add_argument(
+            '--snapshot-dir', default=settings.SEED_SNAPSHOT_DIR,
+            help='Каталог снимков seed.'
+        )
+        for name, default in COUNTS.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--random-seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['writers'] > options['threads']:
+            raise CommandError('Писателей не может быть больше потоков')
+        if options['snapshot']:
+            call_command(
+                'seed', flush=True, snapshot_dir=options['snapshot_dir'],
+                random_seed=options['random_seed'], stdout=self.stdout,
+                **{name: options[name] for name in COUNTS}
+            )
+        posts = list(Post.objects.values_list('pk', flat=True)[:1000])
+        if not posts:
+            raise CommandError(
+                'В базе нет постов: загрузите их командой seed '
+                'или добавьте --snapshot'
+            )
+        usernames = list(
+            User.objects.filter(posts__isnull=False)
+            .values_list('username', flat=True).distinct()[:100]
+        )
+        # Своё имя на каждый запуск: удаляется только созданный здесь
+        # пользователь, а не чужой с тем же именем.
+        user = User.objects.create_user(
+            username=f'{BENCH_USERNAME}_{uuid.uuid4().hex[:12]}'
+        )
+        names = list(PHASES) if options['phase'] == 'both' else [
+            options['phase']
+        ]
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        saved = database.copy()
+        results = {}
+        try:
+            for name in names:
+                database.update(PHASES[name])
+                # Режим журнала меняется, пока нет других соединений.
+                connection.close()
+                connection.ensure_connection()
+                results[name] = self.run_phase(
+                    user, posts, usernames, options
+                )
+                self.report(name, results[name], options['seconds'])
+        finally:
+            database.clear()
+            database.update(saved)
+            connection.close()
+            Comment.objects.filter(author=user).delete()
+            user.delete()
+        if len(results) == 2:
+            before, after = results['baseline'], results['tuned']
+            speedup = (after.reads + after.writes) / max(
+                before.reads + before.writes, 1
+            )
+            self.stdout.write(
+                f'Пропускная способность: x{speedup:.2f}, '
+                f'ошибок database is locked: {before.locked} -> {after.locked}'
+            )
+
+    def run_phase(self, user, posts, usernames, options):
+        stats = Stats()
+        deadline = time.monotonic() + options['seconds']
+        threads = options['threads']
+        jobs = [
+            (user, posts, usernames, deadline, number < options['writers'],
+             stats)
+            for number in range(threads)
+        ]
+        if threads == 1:
+            worker(*jobs[0])
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                for future in [pool.submit(worker, *job) for job in jobs]:
+                    future.result()
+        return stats
+
+    def report(self, name, stats, seconds):
+        pragmas = current_pragmas(
+            connection, ('journal_mode', 'synchronous', 'busy_timeout')
+        )
+        self.stdout.write(
+            f'{name} ({", ".join(f"{k}={v}" for k, v in pragmas.items())}): '
+            f'чтений/с {stats.reads / seconds:.1f}, '
+            f'записей/с {stats.writes / seconds:.1f}, '
+            f'database is locked {stats.locked}, '
+            f'других ошибок {stats.errors}, '
+            f'p50 {stats.percentile(0.5) * 1000:.1f} мс, '
+            f'p95 {stats.percentile(0.95) * 1000:.1f} мс'
+        )
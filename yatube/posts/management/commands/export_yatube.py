@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import CONTENT_TYPES, export_chunks
+from posts.models import Post, User
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты и комментарии пользователя в JSONL, CSV или tar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--format', choices=CONTENT_TYPES, default='jsonl',
+            help='tar - JSONL вместе с картинками постов.'
+        )
+        parser.add_argument(
+            '--output', default='-', help='Файл выгрузки, "-" - stdout.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден'
+            )
+        chunks = export_chunks(
+            author, options['format'], Post._meta.get_field('image').storage
+        )
+        binary = options['format'] == 'tar'
+        if options['output'] == '-':
+            for chunk in chunks:
+                if binary:
+                    sys.stdout.buffer.write(chunk)
+                else:
+                    self.stdout.write(chunk, ending='')
+            return
+        mode, encoding = ('wb', None) if binary else ('w', 'utf-8')
+        with open(options['output'], mode, encoding=encoding,
+                  newline=None if binary else '') as output:
+            for chunk in chunks:
+                output.write(chunk)
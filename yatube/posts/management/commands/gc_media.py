@@ -0,0 +1,135 @@
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import StoredFile
+from posts.models import Post
+
+CHUNK_SIZE = 2000
+
+
+def referenced_names():
+    """Пути картинок из базы по возрастанию, без повторов."""
+    previous = None
+    for name in (
+        Post.objects
+        .exclude(image='')
+        .exclude(image=None)
+        .order_by('image')
+        .values_list('image', flat=True)
+        .iterator(chunk_size=CHUNK_SIZE)
+    ):
+        if name != previous:
+            yield name
+        previous = name
+
+
+def walk(root, prefix):
+    """Файлы каталога в том же порядке, в каком база сортирует пути.
+
+    Каталог сравнивается по имени со слешем на конце, иначе
+    `ab/…` оказался бы раньше `ab.gif`, а в строках наоборот.
+    """
+    with os.scandir(os.path.join(root, prefix)) as scan:
+        entries = sorted(
+            scan,
+            key=lambda entry: entry.name + ('/' if entry.is_dir() else '')
+        )
+    for entry in entries:
+        name = f'{prefix}/{entry.name}'
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk(root, name)
+        elif entry.is_file(follow_symlinks=False):
+            yield name, entry
+
+
+def still_orphan(path):
+    """Повторная проверка перед удалением, под блокировкой записи.
+
+    Между обходом каталога и удалением файл могли загрузить заново:
+    хранилище с адресацией по содержимому кладёт одинаковые байты
+    по тому же пути. Удаление строки `StoredFile` берёт блокировку
+    записи, поэтому параллельный `_save` либо уже добавил ссылку,
+    либо дождётся конца транзакции и запишет файл заново.
+    """
+    StoredFile.objects.filter(name=path, refs=0).delete()
+    return not (
+        StoredFile.objects.filter(name=path).exists()
+        or Post.objects.filter(image=path).exists()
+    )
+
+
+def orphans(root, prefix):
+    """Файлы под `prefix`, на которые не ссылается ни один пост.
+
+    Оба потока упорядочены, поэтому сравниваются слиянием
+    и ни один не загружается в память целиком.
+    """
+    names = referenced_names()
+    name = next(names, None)
+    for path, entry in walk(root, prefix):
+        while name is not None and name < path:
+            name = next(names, None)
+        if name != path:
+            yield path, entry
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки, на которые не ссылается ни один пост.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Не трогать файлы моложе этого: их могут загружать сейчас.'
+        )
+        parser.add_argument(
+            '--quarantine',
+            help='Переносить файлы в этот каталог вместо удаления.'
+        )
+        parser.add_argument(
+            '--prefix', default='posts',
+            help='Каталог внутри MEDIA_ROOT, который нужно проверить.'
+        )
+
+    def handle(self, *args, **options):
+        root = settings.MEDIA_ROOT
+        prefix = options['prefix'].strip('/')
+        if not os.path.isdir(os.path.join(root, prefix)):
+            self.stdout.write('Каталог пуст')
+            return
+        deadline = time.time() - options['grace_hours'] * 60 * 60
+        quarantine = options['quarantine']
+        files = size = 0
+        for path, entry in orphans(root, prefix):
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > deadline:
+                continue
+            if options['dry_run']:
+                files += 1
+                size += stat.st_size
+                self.stdout.write(f'{path} {stat.st_size}')
+                continue
+            with transaction.atomic():
+                if not still_orphan(path):
+                    continue
+                if quarantine:
+                    target = os.path.join(quarantine, path)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.move(entry.path, target)
+                else:
+                    os.remove(entry.path)
+            files += 1
+            size += stat.st_size
+        action = (
+            'Будет освобождено' if options['dry_run']
+            else 'Перенесено' if quarantine else 'Удалено'
+        )
+        self.stdout.write(f'{action}: файлов {files}, байт {size}')
@@ -0,0 +1,418 @@
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import preserve_created, rebuild_affected, rebuild_derived
+from posts.models import Comment, Follow, Group, Post, User
+
+# Порядок сброса буферов: сначала то, на что ссылаются остальные.
+ROW_TYPES = ('user', 'group', 'post', 'comment', 'follow')
+# Обязательные поля строк каждого типа.
+REQUIRED = {
+    'user': ('username',),
+    'group': ('slug',),
+    'post': ('author', 'text'),
+    'comment': ('author', 'post', 'text'),
+    'follow': ('user', 'author'),
+}
+# Больше затронутых id не копится: дешевле пересчитать всю базу.
+AFFECTED_LIMIT = 100000
+# Сколько неверных строк описывать в выводе; остальные только считаются.
+MAX_WARNINGS = 20
+
+
+def read_jsonl(stream):
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {
+            key: value for key, value in row.items() if value != ''
+        }
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def parse_created(value):
+    if not value:
+        return timezone.now()
+    try:
+        created = parse_datetime(value)
+    except (TypeError, ValueError):
+        created = None
+    if created is None:
+        raise ValueError(f'неверная дата: {value!r}')
+    if timezone.is_naive(created):
+        created = timezone.make_aware(created)
+    return created
+
+
+def clean(row):
+    """Проверяет строку и приводит значения к типам полей.
+
+    Строки неизвестного типа возвращаются как есть; ошибки -
+    ValueError с описанием.
+    """
+    if not isinstance(row, dict):
+        raise ValueError('ожидался JSON-объект')
+    required = REQUIRED.get(row.get('type'))
+    if required is None:
+        return row
+    missing = [field for field in required if row.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f'нет полей {", ".join(missing)}')
+    row = dict(row)
+    for field in ('id', 'post'):
+        if row.get(field) not in (None, ''):
+            try:
+                row[field] = int(row[field])
+            except (TypeError, ValueError):
+                raise ValueError(f'{field} не число: {row[field]!r}')
+    if row['type'] in ('post', 'comment', 'follow'):
+        row['created'] = parse_created(row.get('created'))
+    return row
+
+
+class Importer:
+    """Копит строки в буферах и вставляет их пачками.
+
+    Имена пользователей и слаги групп разрешаются в id через словари
+    в памяти, которые дополняются одним запросом на пачку. Id
+    затронутых пользователей, постов и групп копятся для пересчёта
+    производных данных (см. `touch`).
+    """
+
+    def __init__(self, batch_size, create_missing,
+                 affected_limit=AFFECTED_LIMIT):
+        self.batch_size = batch_size
+        self.create_missing = create_missing
+        self.users = {}
+        self.groups = {}
+        self.buffers = {row_type: [] for row_type in ROW_TYPES}
+        self.buffered = 0
+        self.loaded = Counter()
+        self.skipped = Counter()
+        self.invalid = 0
+        self.affected_limit = affected_limit
+        self.touched = {'users': set(), 'posts': set(), 'groups': set()}
+
+    def touch(self, kind, ids):
+        """Запоминает затронутые id, пока их не больше `affected_limit`.
+
+        Дальше списки не растут, а после загрузки пересчитывается
+        вся база: память не зависит от объёма файла.
+        """
+        if self.touched is None:
+            return
+        self.touched[kind].update(ids)
+        if sum(map(len, self.touched.values())) > self.affected_limit:
+            self.touched = None
+
+    def add(self, number, row):
+        """Буферизует строку; для неверной возвращает описание ошибки."""
+        try:
+            row = clean(row)
+        except ValueError as error:
+            self.invalid += 1
+            return f'Строка {number}: {error}'
+        row_type = row.get('type')
+        if row_type not in self.buffers:
+            self.skipped[row_type or 'unknown'] += 1
+            return None
+        self.buffers[row_type].append(row)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+        return None
+
+    def flush(self):
+        for row_type in ROW_TYPES:
+            rows = self.buffers[row_type]
+            if rows:
+                getattr(self, f'flush_{row_type}s')(rows)
+                self.buffers[row_type] = []
+        self.buffered = 0
+
+    def resolve(self, cache, model, field, keys, defaults):
+        """Дополняет словарь `cache` id объектов с заданными ключами."""
+        missing = {key for key in keys if key and key not in cache}
+        if not missing:
+            return
+        cache.update(
+            model.objects
+            .filter(**{f'{field}__in': missing})
+            .values_list(field, 'pk')
+        )
+        missing -= cache.keys()
+        if missing and self.create_missing:
+            model.objects.bulk_create(
+                (model(**{field: key}, **defaults(key)) for key in missing),
+                ignore_conflicts=True,
+            )
+            cache.update(
+                model.objects
+                .filter(**{f'{field}__in': missing})
+                .values_list(field, 'pk')
+            )
+
+    def resolve_users(self, names):
+        self.resolve(
+            self.users, User, 'username', names,
+            lambda name: {'password': make_password(None)}
+        )
+
+    def resolve_groups(self, slugs):
+        self.resolve(
+            self.groups, Group, 'slug', slugs,
+            lambda slug: {'title': slug, 'description': ''}
+        )
+
+    def insert(self, row_type, model, objects, total, key=None,
+               existing=()):
+        """Вставляет объекты и возвращает вставленные.
+
+        Объекты, чей уникальный ключ `key` уже есть в `existing` или
+        повторяется в пачке, не вставляются и считаются пропущенными;
+        объекты с ключом None вставляются всегда.
+        """
+        if key is not None:
+            seen = set(existing)
+            fresh = []
+            for obj in objects:
+                value = key(obj)
+                if value is None or value not in seen:
+                    seen.add(value)
+                    fresh.append(obj)
+            objects = fresh
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+        self.loaded[row_type] += len(objects)
+        self.skipped[row_type] += total - len(objects)
+        return objects
+
+    def flush_users(self, rows):
+        names = {row['username'] for row in rows}
+        users = self.insert(
+            'user', User,
+            [
+                User(
+                    username=row['username'],
+                    first_name=row.get('first_name', ''),
+                    last_name=row.get('last_name', ''),
+                    email=row.get('email', ''),
+                    password=row.get('password') or make_password(None),
+                )
+                for row in rows
+            ],
+            len(rows),
+            key=lambda user: user.username,
+            existing=User.objects.filter(username__in=names)
+            .values_list('username', flat=True)
+        )
+        self.resolve_users(names)
+        self.touch('users', (self.users[user.username] for user in users))
+
+    def flush_groups(self, rows):
+        slugs = {row['slug'] for row in rows}
+        groups = self.insert(
+            'group', Group,
+            [
+                Group(
+                    slug=row['slug'],
+                    title=row.get('title', row['slug']),
+                    description=row.get('description', ''),
+                )
+                for row in rows
+            ],
+            len(rows),
+            key=lambda group: group.slug,
+            existing=Group.objects.filter(slug__in=slugs)
+            .values_list('slug', flat=True)
+        )
+        self.resolve_groups(slugs)
+        self.touch('groups', (self.groups[group.slug] for group in groups))
+
+    def flush_posts(self, rows):
+        self.resolve_users(row['author'] for row in rows)
+        self.resolve_groups(row.get('group') for row in rows)
+        ids = {row['id'] for row in rows if row.get('id') is not None}
+        posts = self.insert(
+            'post', Post,
+            [
+                Post(
+                    id=row.get('id'),
+                    text=row['text'],
+                    author_id=self.users[row['author']],
+                    group_id=self.groups.get(row.get('group')),
+                    image=row.get('image') or None,
+                    created=row['created'],
+                )
+                for row in rows
+                if row['author'] in self.users
+                and (not row.get('group') or row['group'] in self.groups)
+            ],
+            len(rows),
+            key=lambda post: post.id,
+            existing=Post.objects.filter(pk__in=ids)
+            .values_list('pk', flat=True)
+        )
+        self.touch('users', (post.author_id for post in posts))
+        self.touch('groups', (
+            post.group_id for post in posts if post.group_id
+        ))
+
+    def flush_comments(self, rows):
+        self.resolve_users(row['author'] for row in rows)
+        posts = set(
+            Post.objects
+            .filter(pk__in={row['post'] for row in rows})
+            .values_list('pk', flat=True)
+        )
+        comments = self.insert('comment', Comment, [
+            Comment(
+                post_id=row['post'],
+                author_id=self.users[row['author']],
+                text=row['text'],
+                created=row['created'],
+            )
+            for row in rows
+            if row['author'] in self.users and row['post'] in posts
+        ], len(rows))
+        self.touch('posts', (comment.post_id for comment in comments))
+
+    def flush_follows(self, rows):
+        self.resolve_users(
+            name for row in rows for name in (row['user'], row['author'])
+        )
+        follows = [
+            Follow(
+                user_id=self.users[row['user']],
+                author_id=self.users[row['author']],
+                created=row['created'],
+            )
+            for row in rows
+            if row['user'] in self.users
+            and row['author'] in self.users
+            and row['user'] != row['author']
+        ]
+        follows = self.insert(
+            'follow', Follow, follows, len(rows),
+            key=lambda follow: (follow.user_id, follow.author_id),
+            existing=Follow.objects.filter(
+                user_id__in={follow.user_id for follow in follows},
+                author_id__in={follow.author_id for follow in follows},
+            ).values_list('user_id', 'author_id')
+        )
+        self.touch('users', (
+            pk for follow in follows
+            for pk in (follow.user_id, follow.author_id)
+        ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, группы, посты, комментарии и подписки '
+        'из JSONL или CSV. Каждая строка содержит поле type.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с данными, "-" - stdin.')
+        parser.add_argument(
+            '--format', choices=READERS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк вставлять одним bulk_create.'
+        )
+        parser.add_argument(
+            '--transaction-size', type=int, default=10000,
+            help='Сколько строк загружать в одной транзакции.'
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать пользователей и группы, на которые есть ссылки.'
+        )
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Не пересчитывать ленты, счётчики и поисковый индекс.'
+        )
+        parser.add_argument(
+            '--rebuild-all', action='store_true',
+            help='Пересчитать производные данные всей базы, а не только '
+                 'затронутых загрузкой пользователей и постов.'
+        )
+        parser.add_argument(
+            '--affected-limit', type=int, default=AFFECTED_LIMIT,
+            help='Сколько затронутых объектов пересчитывать выборочно; '
+                 'при большем числе пересчитывается вся база.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        data_format = options['format'] or path.rpartition('.')[2].lower()
+        if data_format not in READERS:
+            raise CommandError('Укажите --format jsonl или --format csv')
+        if path == '-':
+            importer = self.load(sys.stdin, data_format, options)
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                importer = self.load(stream, data_format, options)
+        if options['skip_derived']:
+            return
+        if options['rebuild_all'] or importer.touched is None:
+            rebuild_derived(options['batch_size'])
+        else:
+            rebuild_affected(
+                importer.touched['users'], importer.touched['posts'],
+                importer.touched['groups'], options['batch_size']
+            )
+        self.stdout.write('Производные данные пересчитаны')
+
+    def load(self, stream, data_format, options):
+        importer = Importer(
+            options['batch_size'], options['create_missing'],
+            options['affected_limit']
+        )
+        rows = READERS[data_format](stream)
+        total = 0
+        started = time.monotonic()
+        with preserve_created(Post, Comment, Follow):
+            while True:
+                chunk = list(islice(rows, options['transaction_size']))
+                if not chunk:
+                    break
+                with transaction.atomic():
+                    for number, row in chunk:
+                        error = importer.add(number, row)
+                        if error and importer.invalid <= MAX_WARNINGS:
+                            self.stderr.write(error)
+                    importer.flush()
+                total += len(chunk)
+                rate = total / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(f'Строк: {total}, {rate:.0f} в секунду')
+        for row_type, count in sorted(importer.loaded.items()):
+            self.stdout.write(f'{row_type}: загружено {count}')
+        for row_type, count in sorted(importer.skipped.items()):
+            self.stdout.write(f'{row_type}: пропущено {count}')
+        if importer.invalid:
+            self.stdout.write(f'Неверных строк: {importer.invalid}')
+        return importer
@@ -0,0 +1,327 @@
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import (
+    HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+)
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+)
+from django.urls import reverse
+
+from posts.dataset import PASSWORD
+from posts.management.commands.seed import COUNTS
+from posts.models import Group, Post, User
+
+# Адрес не из INTERNAL_IPS, чтобы не включалась панель отладки.
+REMOTE_ADDR = '192.0.2.1'
+
+# Маршрут -> вес; записи доступны только авторизованным клиентам.
+ANONYMOUS_MIX = {
+    'posts:index': 30,
+    'posts:group_list': 15,
+    'posts:profile': 15,
+    'posts:post_detail': 25,
+    'posts:search': 5,
+    'about:author': 3,
+    'about:tech': 2,
+    'users:signup': 5,
+}
+USER_MIX = {
+    **ANONYMOUS_MIX,
+    'posts:follow_index': 20,
+    'posts:add_comment': 10,
+    'posts:post_create': 5,
+}
+
+
+def percentile(values, share):
+    """Значение по ближайшему рангу из отсортированного списка."""
+    if not values:
+        return None
+    return values[max(math.ceil(len(values) * share) - 1, 0)]
+
+
+class NoRedirect(HTTPRedirectHandler):
+    # Редирект после записи - ответ маршрута, а не новый запрос.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Dataset:
+    def __init__(self, usernames):
+        self.usernames = usernames
+        self.group_slugs = list(
+            Group.objects.order_by('pk').values_list('slug', flat=True)[:1000]
+        )
+        self.post_ids = list(
+            Post.objects.order_by('-created', '-pk')
+            .values_list('pk', flat=True)[:5000]
+        )
+        if not self.post_ids or not self.group_slugs:
+            raise CommandError('Нужны посты и группы: уберите --no-seed')
+
+
+class VirtualUser:
+    """Клиент со своими cookie; `username` - None для анонима."""
+
+    def __init__(self, base_url, dataset, username, rng):
+        self.base_url = base_url
+        self.dataset = dataset
+        self.username = username
+        self.rng = rng
+        self.cookies = CookieJar()
+        self.opener = build_opener(
+            HTTPCookieProcessor(self.cookies), NoRedirect()
+        )
+        self.mix = USER_MIX if username else ANONYMOUS_MIX
+        self.routes = list(self.mix)
+        self.weights = list(self.mix.values())
+
+    def open(self, path, data=None):
+        request = Request(
+            self.base_url + path,
+            data=urlencode(data).encode() if data is not None else None
+        )
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                return response.status, response.read()
+        except HTTPError as error:
+            return error.code, error.read()
+
+    def post(self, path, data):
+        # Форме подходит и значение cookie csrftoken: страницу
+        # с формой перед каждой записью запрашивать не нужно.
+        token = next(
+            (cookie.value for cookie in self.cookies
+             if cookie.name == settings.CSRF_COOKIE_NAME),
+            ''
+        )
+        return self.open(path, {**data, 'csrfmiddlewaretoken': token})[0]
+
+    def login(self):
+        path = reverse('users:login')
+        self.open(path)
+        status = self.post(
+            path, {'username': self.username, 'password': PASSWORD}
+        )
+        if status != 302:
+            raise CommandError(f'Не удалось войти как {self.username}')
+
+    def request(self, route):
+        """Выполняет запрос маршрута; возвращает код ответа."""
+        data = self.dataset
+        rng = self.rng
+        if route == 'posts:group_list':
+            path = reverse(route, args=[rng.choice(data.group_slugs)])
+        elif route == 'posts:profile':
+            path = reverse(route, args=[rng.choice(data.usernames)])
+        elif route in ('posts:post_detail', 'posts:add_comment'):
+            path = reverse(route, args=[rng.choice(data.post_ids)])
+        elif route == 'posts:search':
+            path = reverse(route) + '?' + urlencode({'q': 'пост'})
+        else:
+            path = reverse(route)
+        if route in ('posts:add_comment', 'posts:post_create'):
+            return self.post(path, {'text': 'нагрузка'})
+        return self.open(path)[0]
+
+    def next_route(self):
+        return self.rng.choices(self.routes, self.weights)[0]
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {}
+        self.errors = {}
+
+    def add(self, route, elapsed, failed):
+        with self.lock:
+            self.timings.setdefault(route, []).append(elapsed)
+            self.errors[route] = self.errors.get(route, 0) + failed
+
+    def summary(self, elapsed):
+        def stats(timings, errors):
+            timings = sorted(timings)
+            return {
+                'requests': len(timings),
+                'errors': errors,
+                'rps': round(len(timings) / elapsed, 2),
+                **{
+                    f'p{int(share * 100)}_ms': round(
+                        percentile(timings, share) * 1000, 2
+                    )
+                    for share in (0.5, 0.95, 0.99)
+                },
+            }
+        routes = {
+            route: stats(timings, self.errors[route])
+            for route, timings in self.timings.items()
+        }
+        every = [value for timings in self.timings.values()
+                 for value in timings]
+        total = stats(every, sum(self.errors.values())) if every else {}
+        return {'elapsed_s': round(elapsed, 2), 'total': total,
+                'routes': routes}
+
+
+def drive(user, deadline, results):
+    while time.monotonic() < deadline:
+        route = user.next_route()
+        started = time.perf_counter()
+        try:
+            status = user.request(route)
+        except (URLError, OSError):
+            status = 599
+        results.add(route, time.perf_counter() - started, status >= 400)
+
+
+def start_server():
+    """Многопоточный WSGI-сервер проекта на свободном порту."""
+    application = get_internal_wsgi_application()
+
+    def app(environ, start_response):
+        environ['REMOTE_ADDR'] = REMOTE_ADDR
+        return application(environ, start_response)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(app)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+class Command(BaseCommand):
+    help = ('Нагружает сайт параллельными клиентами и печатает '
+            'пропускную способность и задержки по маршрутам в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера; по умолчанию сервер '
+                 'поднимается в этом процессе.'
+        )
+        parser.add_argument('--clients', type=int, default=8)
+        parser.add_argument(
+            '--duration', type=float, default=30, help='Секунд нагрузки.'
+        )
+        parser.add_argument(
+            '--logged-in', type=float, default=0.5,
+            help='Доля авторизованных клиентов.'
+        )
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Не загружать данные, использовать уже загруженные '
+                 'командой seed.'
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Заменить данные в базе снимком seed: без этого '
+                 'снимок загружается только в пустую базу.'
+        )
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=4000)
+        parser.add_argument('--follows', type=int, default=500)
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument(
+            '--snapshot-dir', default=settings.SEED_SNAPSHOT_DIR,
+            help='Каталог снимков seed.'
+        )
+        parser.add_argument(
+            '--output', help='Файл для JSON-отчёта вместо вывода.'
+        )
+
+    def load_users(self, options):
+        """Имена пользователей набора; при необходимости загружает
+        снимок seed с заданными размерами."""
+        if not options['no_seed'] and (
+            options['flush'] or not User.objects.exists()
+        ):
+            # Снимок заменяет базу целиком, и прогоны с одними
+            # параметрами меряются на одних и тех же данных.
+            call_command(
+                'seed', flush=options['flush'],
+                snapshot_dir=options['snapshot_dir'],
+                random_seed=options['random_seed'],
+                verbosity=0, stdout=self.stderr,
+                **{name: options[name] for name in COUNTS}
+            )
+        elif not options['no_seed']:
+            self.stderr.write(
+                'База не пуста, снимок не загружен; '
+                '--flush заменит данные снимком'
+            )
+        usernames = list(
+            User.objects.order_by('pk')
+            .values_list('username', flat=True)[:5000]
+        )
+        if not usernames:
+            raise CommandError('В базе нет пользователей')
+        return usernames
+
+    def handle(self, *args, **options):
+        usernames = self.load_users(options)
+        dataset = Dataset(usernames)
+        server = None
+        base_url = options['url']
+        if base_url is None:
+            server, base_url = start_server()
+        base_url = base_url.rstrip('/')
+        rng = random.Random(options['random_seed'])
+        users = []
+        for number in range(options['clients']):
+            logged_in = rng.random() < options['logged_in']
+            user = VirtualUser(
+                base_url, dataset,
+                rng.choice(usernames) if logged_in else None,
+                random.Random(rng.random())
+            )
+            if logged_in:
+                user.login()
+            users.append(user)
+        results = Results()
+        started = time.monotonic()
+        deadline = started + options['duration']
+        try:
+            with ThreadPoolExecutor(max_workers=len(users) or 1) as pool:
+                for future in [
+                    pool.submit(drive, user, deadline, results)
+                    for user in users
+                ]:
+                    future.result()
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        report = {
+            'config': {
+                name: options[name] for name in (
+                    'clients', 'duration', 'logged_in', *COUNTS,
+                    'random_seed'
+                )
+            },
+            **results.summary(time.monotonic() - started),
+        }
+        text = json.dumps(report, indent=2, sort_keys=True,
+                          ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(text + '\n')
+        else:
+            self.stdout.write(text)
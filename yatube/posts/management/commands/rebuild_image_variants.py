@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import build_variants
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии картинок уже опубликованных постов.'
+
+    def handle(self, *args, **options):
+        total = 0
+        for post in (
+            Post.objects.exclude(image='').exclude(image=None).iterator()
+        ):
+            build_variants(post)
+            total += 1
+        self.stdout.write(f'Обработано постов: {total}')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и подписок пользователей с нуля.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько пользователей пересчитывать за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_all(options['batch_size'])
+        self.stdout.write(f'Пересчитано пользователей: {total}')
@@ -0,0 +1,81 @@
+import os
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db import copy_database, restore_database
+from posts.dataset import generate, snapshot_path
+from posts.models import Post, User
+
+COUNTS = {
+    'users': 10000,
+    'groups': 100,
+    'posts': 200000,
+    'comments': 400000,
+    'follows': 200000,
+}
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными с перекосами '
+            'живого сайта или копирует готовый снимок.')
+
+    def add_arguments(self, parser):
+        for name, default in COUNTS.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--snapshot-dir', default=settings.SEED_SNAPSHOT_DIR,
+            help='Каталог снимков.'
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Сгенерировать данные заново, даже если снимок есть.'
+        )
+        parser.add_argument(
+            '--flush', action='store_true',
+            help='Очистить базу перед загрузкой.'
+        )
+
+    def handle(self, *args, **options):
+        counts = {name: options[name] for name in COUNTS}
+        path = snapshot_path(
+            options['snapshot_dir'], counts, options['random_seed']
+        )
+        if not options['flush'] and (
+            User.objects.exists() or Post.objects.exists()
+        ):
+            raise CommandError(
+                'База не пуста: добавьте --flush, чтобы очистить её'
+            )
+        started = time.monotonic()
+        if os.path.exists(path) and not options['rebuild']:
+            # Снимок заменяет базу целиком, очищать её не нужно.
+            restore_database(path)
+            cache.clear()
+            self.stdout.write(
+                f'Снимок {path} восстановлен за '
+                f'{time.monotonic() - started:.1f} с'
+            )
+            return
+        if options['flush']:
+            call_command('flush', interactive=False, verbosity=0)
+        generate(
+            counts, random.Random(options['random_seed']),
+            options['batch_size'],
+            progress=self.stdout.write if options['verbosity'] > 1 else None
+        )
+        os.makedirs(options['snapshot_dir'], exist_ok=True)
+        # Копия пишется рядом и подменяет снимок целиком.
+        temp_path = f'{path}.tmp'
+        copy_database(temp_path)
+        os.replace(temp_path, path)
+        self.stdout.write(
+            f'Данные созданы за {time.monotonic() - started:.1f} с, '
+            f'снимок: {path}'
+        )
@@ -0,0 +1,39 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def fill_user_stats(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+
+    def totals(queryset, field):
+        return dict(
+            queryset.values_list(field).annotate(total=Count('pk')).order_by()
+        )
+
+    posts = totals(Post.objects, 'author_id')
+    followers = totals(Follow.objects, 'author_id')
+    following = totals(Follow.objects, 'user_id')
+    UserStats.objects.bulk_create(
+        UserStats(
+            user_id=user_id,
+            posts_count=posts.get(user_id, 0),
+            followers_count=followers.get(user_id, 0),
+            following_count=following.get(user_id, 0),
+        )
+        for user_id in User.objects.filter(stats__isnull=True)
+        .values_list('pk', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_user_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_comments(apps, schema_editor):
+    # 0013 группировал подзапрос и по Comment.Meta.ordering, поэтому
+    # посты с несколькими комментариями получили счётчик 1.
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Post.objects.update(
+        comments_count=Coalesce(
+            Subquery(
+                Comment.objects
+                .filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_fill_user_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_comments, migrations.RunPython.noop),
+    ]
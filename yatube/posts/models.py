@@ -1,7 +1,10 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
 from core.models import CreatedModel
+from core.storage import content_storage
 
 User = get_user_model()
 
@@ -38,14 +41,43 @@ class Post(CreatedModel):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=content_storage,
         blank=True,
         null=True,
         help_text='Выберите картинку'
     )
+    image_variants = models.TextField(
+        'Копии картинки',
+        blank=True,
+        editable=False,
+        help_text='Адреса и размеры уменьшенных копий в JSON'
+    )
+    comments_count = models.PositiveIntegerField(
+        'Комментариев',
+        default=0,
+        editable=False
+    )
+
+    class Meta(CreatedModel.Meta):
+        indexes = [
+            models.Index(
+                fields=('author', 'created'), name='post_author_created'),
+            models.Index(
+                fields=('group', 'created'), name='post_group_created'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def variants(self):
+        """Копии картинки: {'feed': {'jpeg': {'url', 'width', ...}}}."""
+        try:
+            variants = json.loads(self.image_variants)
+        except ValueError:
+            return {}
+        return variants if isinstance(variants, dict) else {}
+
 
 class Comment(CreatedModel):
     post = models.ForeignKey(
@@ -71,6 +103,10 @@ class Comment(CreatedModel):
 
     class Meta:
         ordering = ('created', )
+        indexes = [
+            models.Index(
+                fields=('post', 'created'), name='comment_post_created'),
+        ]
 
 
 class Follow(CreatedModel):
@@ -88,6 +124,11 @@ class Follow(CreatedModel):
         blank=True,
         related_name='following'
     )
+    fanout = models.BooleanField(
+        'Раздача в ленту',
+        default=True,
+        help_text='Посты автора раскладываются в ленту подписчика при записи'
+    )
 
     class Meta:
         constraints = [
@@ -100,3 +141,73 @@ class Follow(CreatedModel):
                 name='user_is_not_author'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=('author', 'fanout', 'user'),
+                name='follow_author_fanout_user'
+            ),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок.
+
+    Заполняется при публикации поста (fan-out on write), поэтому
+    лента читается одним диапазоном по индексу (user, created, post).
+    """
+    user = models.ForeignKey(
+        User,
+        verbose_name='Подписчик',
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='Пост',
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='Автор',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    created = models.DateTimeField('Дата публикации поста')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='timeline_unique'),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', 'created', 'post'),
+                name='timeline_user_created'
+            ),
+            models.Index(
+                fields=('user', 'author'),
+                name='timeline_user_author'
+            ),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики пользователя.
+
+    Поддерживаются сигналами атомарными F-инкрементами, пересчитываются
+    командой `rebuild_user_stats`.
+    """
+    user = models.OneToOneField(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    def __str__(self):
+        return f'{self.user}: {self.posts_count}/{self.followers_count}'
@@ -0,0 +1,139 @@
+"""Полнотекстовый поиск по постам.
+
+Инвертированный индекс - таблица SQLite FTS5 `posts_post_fts`
+с rowid, равным id поста. Индекс обновляется сигналами `Post`,
+команда `rebuild_search_index` перестраивает его целиком.
+Результаты ранжируются по bm25 и листаются курсором (rank, id).
+"""
+import re
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from core.paginator import CursorPaginator
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_TOKENS = 24
+
+SEARCH_SQL = f'''
+    SELECT id, score, snippet FROM (
+        SELECT rowid AS id,
+               bm25({FTS_TABLE}) AS score,
+               snippet({FTS_TABLE}, 0, char(2), char(3), '…',
+                       {SNIPPET_TOKENS}) AS snippet
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s
+    )
+'''
+
+
+def fts_query(text):
+    """Запрос FTS5: все слова обязательны, каждое - как префикс."""
+    terms = re.findall(r'\w+', text.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_post(post):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)',
+            [post.pk, post.text]
+        )
+
+
+def unindex_post(post_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+        )
+
+
+def rebuild(author_ids=None):
+    """Перестраивает индекс по всем постам или по постам авторов."""
+    condition, params = '', []
+    if author_ids is not None:
+        params = list(author_ids)
+        if not params:
+            return
+        condition = f' WHERE author_id IN ({", ".join(["%s"] * len(params))})'
+    with connection.cursor() as cursor:
+        if condition:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+                '(SELECT id FROM posts_post' + condition + ')',
+                params
+            )
+        else:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, text) '
+            'SELECT id, text FROM posts_post' + condition,
+            params
+        )
+
+
+def matching_posts(queryset, text):
+    """Сужает выборку постов до найденных индексом."""
+    query = fts_query(text)
+    if not query:
+        return queryset
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [query]
+    ))
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и подсвечивает найденные слова."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсорный пагинатор результатов поиска по ключу (rank, id).
+
+    У найденных постов заполняется `snippet` с подсветкой.
+    """
+    parse_key = float
+
+    def __init__(self, text, per_page):
+        self.query = fts_query(text)
+        self.descending = False
+        Paginator.__init__(self, [], per_page)
+        self.window = 1
+
+    def fetch(self, cursor, descending, stop, start=0):
+        if not self.query:
+            return []
+        sql, params = SEARCH_SQL, [self.query]
+        if cursor is not None:
+            sign = '<' if descending else '>'
+            sql += f' WHERE score {sign} %s OR (score = %s AND id {sign} %s)'
+            params += [cursor[0], cursor[0], cursor[1]]
+        order = 'DESC' if descending else 'ASC'
+        sql += f' ORDER BY score {order}, id {order} LIMIT %s OFFSET %s'
+        params += [stop - start, start]
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            rows = db_cursor.fetchall()
+        posts = (
+            Post.objects
+            .select_related('author', 'group')
+            .in_bulk([pk for pk, _, _ in rows])
+        )
+        result = []
+        for pk, score, snippet in rows:
+            post = posts.get(pk)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                result.append(((score, pk), post))
+        return result
@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import cache
+from core.queue import enqueue
+from . import jobs, search, stats, timeline
+from .models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+def post_scopes(post):
+    """Области кэша, в которых показывается пост."""
+    scopes = ['posts', f'author:{post.author_id}', f'post:{post.pk}']
+    for group_id in {post.group_id, getattr(post, '_saved_group_id', None)}:
+        if group_id:
+            scopes.append(f'group:{group_id}')
+    return scopes
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    # Незакоммиченный файл хранилище сохранит при этом save,
+    # добавив ссылку, даже если содержимое не изменилось.
+    instance._image_uploaded = (
+        bool(instance.image) and not instance.image._committed
+    )
+    if instance.pk:
+        instance._saved_group_id, instance._saved_image = (
+            Post.objects
+            .filter(pk=instance.pk)
+            .values_list('group_id', 'image')
+            .first()
+        ) or (None, None)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    scopes = post_scopes(instance)
+    if created:
+        timeline.fan_out(instance)
+        stats.bump(instance.author_id, posts_count=1)
+        scopes.append(f'stats:{instance.author_id}')
+    search.index_post(instance)
+    cache.bump(*scopes)
+    saved_image = getattr(instance, '_saved_image', None) or ''
+    if (instance.image.name or '') != saved_image:
+        # Копии старой картинки больше не подходят: до сборки новых
+        # шаблоны показывают исходный файл.
+        if instance.image_variants:
+            instance.image_variants = ''
+            Post.objects.filter(pk=instance.pk).update(image_variants='')
+        enqueue(jobs.build_image_variants, instance.pk)
+        instance.image.storage.release(saved_image)
+    elif instance._image_uploaded:
+        # Та же картинка загружена заново: пост по-прежнему
+        # ссылается на файл один раз.
+        instance.image.storage.release(saved_image)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    stats.bump(instance.author_id, posts_count=-1)
+    search.unindex_post(instance.pk)
+    instance.image.storage.release(instance.image.name)
+    cache.bump(*post_scopes(instance), f'stats:{instance.author_id}')
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance)
+        stats.bump(instance.author_id, followers_count=1)
+        stats.bump(instance.user_id, following_count=1)
+        cache.bump(
+            f'follows:{instance.user_id}', f'stats:{instance.user_id}',
+            f'stats:{instance.author_id}'
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.prune(instance)
+    stats.bump(instance.author_id, followers_count=-1)
+    stats.bump(instance.user_id, following_count=-1)
+    cache.bump(
+        f'follows:{instance.user_id}', f'stats:{instance.user_id}',
+        f'stats:{instance.author_id}'
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created and instance.post_id:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F('comments_count') + 1
+        )
+    cache.bump(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F('comments_count') - 1
+        )
+    cache.bump(f'post:{instance.post_id}')
+
+
+@receiver([post_save, post_delete], sender=Group)
+def group_changed(sender, instance, **kwargs):
+    cache.bump('posts', 'groups', f'group:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields, **kwargs):
+    if created:
+        UserStats.objects.create(user=instance)
+        return
+    # Вход пользователя обновляет только last_login - карточки
+    # от этого не меняются.
+    if update_fields == frozenset({'last_login'}):
+        return
+    cache.bump('posts', 'users', f'author:{instance.pk}')
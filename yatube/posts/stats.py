@@ -0,0 +1,111 @@
+"""Счётчики постов, подписчиков и подписок пользователей."""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, UserStats
+
+User = get_user_model()
+
+
+def bump(user_id, **deltas):
+    """Атомарно сдвигает счётчики пользователя.
+
+    Счётчики не опускаются ниже нуля: удаление, совпавшее
+    с пересчётом, иначе нарушило бы ограничение поля. Отсутствующую
+    запись не создаёт - её заводит `rebuild`.
+    """
+    UserStats.objects.filter(user_id=user_id).update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+
+
+def get_stats(user):
+    """Счётчики пользователя.
+
+    Запись заводится при регистрации; если её нет, счётчики
+    считаются без записи в базу, чтобы чтение работало и на реплике.
+    """
+    try:
+        return UserStats.objects.get(user=user)
+    except UserStats.DoesNotExist:
+        return count([user.pk])[0]
+
+
+def count(user_ids):
+    """Несохранённые счётчики пользователей, посчитанные по данным."""
+    user_ids = list(user_ids)
+
+    def totals(queryset, field):
+        return dict(
+            queryset
+            .filter(**{f'{field}__in': user_ids})
+            .values_list(field)
+            .annotate(total=Count('pk'))
+            .order_by()
+        )
+
+    posts = totals(Post.objects, 'author_id')
+    followers = totals(Follow.objects, 'author_id')
+    following = totals(Follow.objects, 'user_id')
+    return [
+        UserStats(
+            user_id=user_id,
+            posts_count=posts.get(user_id, 0),
+            followers_count=followers.get(user_id, 0),
+            following_count=following.get(user_id, 0),
+        )
+        for user_id in user_ids
+    ]
+
+
+def rebuild(user_ids):
+    """Пересчитывает счётчики пользователей с нуля."""
+    user_ids = list(user_ids)
+    rows = count(user_ids)
+    with transaction.atomic():
+        UserStats.objects.filter(user_id__in=user_ids).delete()
+        UserStats.objects.bulk_create(rows)
+
+
+def rebuild_all(batch_size=1000):
+    """Пересчитывает счётчики всех пользователей пачками."""
+    batch = []
+    total = 0
+    for user_id in (
+        User.objects.order_by('pk').values_list('pk', flat=True)
+        .iterator(chunk_size=batch_size)
+    ):
+        batch.append(user_id)
+        if len(batch) == batch_size:
+            rebuild(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        rebuild(batch)
+        total += len(batch)
+    return total
+
+
+def recount_comments(post_ids=None):
+    """Пересчитывает `Post.comments_count` всех или заданных постов."""
+    posts = Post.objects.all()
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    posts.update(
+        comments_count=Coalesce(
+            Subquery(
+                Comment.objects
+                .filter(post=OuterRef('pk'))
+                # Иначе Comment.Meta.ordering попадёт в GROUP BY
+                # и каждый комментарий посчитается отдельной группой.
+                .order_by()
+                .values('post')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0
+        )
+    )
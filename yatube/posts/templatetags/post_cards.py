@@ -0,0 +1,53 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from core.cache import get_versions_many
+from yatube.settings import FEED_CACHE_TIMEOUT
+
+register = template.Library()
+
+CARD_KEY = 'post_card:{}:{}:{:d}{:d}'
+
+
+def card_scopes(post):
+    scopes = [f'post:{post.pk}', f'author:{post.author_id}']
+    if post.group_id:
+        scopes.append(f'group:{post.group_id}')
+    return scopes
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Карточки постов из кэша.
+
+    Ключ карточки включает версии поста, автора и группы. Все
+    карточки страницы читаются одним `get_many`, отрисовываются
+    только промахи и записываются обратно одним `set_many`.
+    """
+    posts = list(posts)
+    user_pk = context['user'].pk
+    match = context['request'].resolver_match
+    show_group_link = not (match and match.view_name == 'posts:group_list')
+    versions = get_versions_many([card_scopes(post) for post in posts])
+    keys = [
+        CARD_KEY.format(
+            post.pk, version, show_group_link, post.author_id == user_pk
+        )
+        for post, version in zip(posts, versions)
+    ]
+    cards = cache.get_many(keys)
+    missing = {}
+    card_template = get_template('posts/includes/post_card.html')
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            missing[key] = card_template.render({
+                'post': post,
+                'show_group_link': show_group_link,
+                'is_author': post.author_id == user_pk,
+            })
+    if missing:
+        cache.set_many(missing, FEED_CACHE_TIMEOUT)
+        cards.update(missing)
+    return mark_safe(''.join(cards[key] for key in keys))
@@ -0,0 +1,213 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core.cache import bump, get_versions
+from posts.tests import testmodule_constants as constants
+from posts.models import Comment, Group, Post, User
+
+
+class VersionedCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.client = Client()
+        cls.group = Group.objects.create(
+            title=constants.GROUP_TITLE,
+            slug=constants.GROUP_SLUG,
+            description=constants.GROUP_DESCRIPTION,
+        )
+        cls.post = Post.objects.create(
+            text=constants.POST_TEXT,
+            group=cls.group,
+            author=cls.user
+        )
+
+    def test_bump_changes_versions(self):
+        before = get_versions('posts', 'group:1')
+        self.assertEqual(before, get_versions('posts', 'group:1'))
+        bump('group:1')
+        self.assertNotEqual(before, get_versions('posts', 'group:1'))
+
+    def test_evicted_version_is_not_reused(self):
+        before = get_versions('author:1')
+        cache.clear()
+        self.assertNotEqual(before, get_versions('author:1'))
+
+    def test_model_changes_bump_scopes(self):
+        cases = (
+            (
+                lambda: Post.objects.create(text=constants.POST_TEXT_2,
+                                            author=self.user),
+                ('posts', f'author:{self.user.pk}'),
+            ),
+            (
+                lambda: Comment.objects.create(post=self.post,
+                                               author=self.user,
+                                               text=constants.COMMENT_TEXT),
+                (f'post:{self.post.pk}',),
+            ),
+            (
+                lambda: Group.objects.filter(pk=self.group.pk).first().save(),
+                ('posts', 'groups', f'group:{self.group.pk}'),
+            ),
+        )
+        for change, scopes in cases:
+            with self.subTest(scopes=scopes):
+                before = {scope: get_versions(scope) for scope in scopes}
+                change()
+                for scope in scopes:
+                    self.assertNotEqual(before[scope], get_versions(scope))
+
+    def test_pages_show_new_posts_at_once(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            self.client.get(url)
+        Post.objects.create(
+            text=constants.POST_TEXT_2,
+            group=self.group,
+            author=self.user
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, constants.POST_TEXT_2)
+
+    def test_cards_are_reused_across_pages(self):
+        url = reverse('posts:index')
+        self.client.get(url)
+        Post.objects.filter(pk=self.post.pk).update(text=constants.POST_TEXT_2)
+        bump('posts')
+        response = self.client.get(url)
+        self.assertContains(response, constants.POST_TEXT)
+        self.assertNotContains(response, constants.POST_TEXT_2)
+        post = Post.objects.get(pk=self.post.pk)
+        post.save()
+        response = self.client.get(url)
+        self.assertContains(response, constants.POST_TEXT_2)
+
+
+class PageCacheTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.guest = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.post = Post.objects.create(
+            text=constants.POST_TEXT,
+            author=cls.user
+        )
+        cls.url = reverse('posts:post_detail', kwargs={'post_id': cls.post.pk})
+
+    def test_anonymous_page_is_served_from_cache(self):
+        self.guest.get(self.url)
+        response = self.guest.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context)
+        self.assertContains(response, constants.POST_TEXT)
+
+    def test_logged_in_user_bypasses_cache(self):
+        self.authorized_client.get(self.url)
+        response = self.authorized_client.get(self.url)
+        self.assertIsNotNone(response.context)
+
+    def test_writes_invalidate_cached_pages(self):
+        self.guest.get(self.url)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': constants.COMMENT_TEXT}
+        )
+        self.assertContains(self.guest.get(self.url), constants.COMMENT_TEXT)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            {'text': constants.POST_TEXT_2}
+        )
+        self.assertContains(self.guest.get(self.url), constants.POST_TEXT_2)
+
+    def test_follow_updates_follower_profile(self):
+        author = User.objects.create_user(username=constants.USER_NAME_2)
+        url = reverse('posts:profile', kwargs={'username': self.user.username})
+        self.assertContains(self.guest.get(url), 'Подписок: 0')
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': author.username}
+        ))
+        self.assertContains(self.guest.get(url), 'Подписок: 1')
+
+
+class ConditionalGetTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.author = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.guest = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.post = Post.objects.create(
+            text=constants.POST_TEXT,
+            author=cls.author
+        )
+        cls.url = reverse('posts:post_detail', kwargs={'post_id': cls.post.pk})
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.author.username}
+        )
+
+    def test_unchanged_page_answers_304_without_rendering(self):
+        etag = self.guest.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.guest.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIsNone(response.context)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        modified = self.guest.get(self.url)['Last-Modified']
+        response = self.guest.get(self.url, HTTP_IF_MODIFIED_SINCE=modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_comment_changes_etag(self):
+        etag = self.guest.get(self.url)['ETag']
+        Comment.objects.create(
+            post=self.post, author=self.user, text=constants.COMMENT_TEXT
+        )
+        response = self.guest.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, constants.COMMENT_TEXT)
+
+    def test_follow_changes_profile_etag(self):
+        etag = self.authorized_client.get(self.profile_url)['ETag']
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author.username}
+        ))
+        response = self.authorized_client.get(
+            self.profile_url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_follower_counter_changes_profile_etag(self):
+        url = reverse('posts:profile', kwargs={'username': self.user.username})
+        etag = self.guest.get(url)['ETag']
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author.username}
+        ))
+        response = self.guest.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Подписок: 1')
+
+    def test_etag_depends_on_user(self):
+        etag = self.guest.get(self.url)['ETag']
+        response = self.authorized_client.get(
+            self.url, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,71 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Comment, Post, User
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class CommentsPaginationTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.client = Client()
+        cls.post = Post.objects.create(
+            text=constants.POST_TEXT,
+            author=cls.user
+        )
+        for i in range(25):
+            Comment.objects.create(
+                post=cls.post,
+                author=cls.user,
+                text=f'{constants.COMMENT_TEXT} {i}'
+            )
+
+    def test_detail_renders_first_comments_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 20)
+        self.assertEqual(comments[0].text, f'{constants.COMMENT_TEXT} 0')
+        self.assertTrue(comments.next_cursor)
+        self.assertEqual(response.context['post'].comments_count, 25)
+
+    def test_fragment_returns_next_batch(self):
+        first = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        ).context['comments']
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'after': first.next_cursor}
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comments_cycle.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            [f'{constants.COMMENT_TEXT} {i}' for i in range(20, 25)]
+        )
+        self.assertFalse(comments.next_cursor)
+
+    def test_comments_count_follows_deletes(self):
+        Comment.objects.filter(post=self.post).first().delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 24)
+
+    def test_migration_recounts_several_comments(self):
+        for name, function in (
+            ('0013_post_comments_count', 'count_comments'),
+            ('0019_recount_comments', 'recount_comments'),
+        ):
+            migration = import_module(f'posts.migrations.{name}')
+            Post.objects.update(comments_count=0)
+            getattr(migration, function)(apps, None)
+            self.post.refresh_from_db()
+            self.assertEqual(self.post.comments_count, 25)
@@ -0,0 +1,133 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.export import FILE_CHUNK_SIZE, export_chunks
+from posts.models import Comment, Post, User
+from yatube import settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ExportTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=constants.USER_NAME)
+        cls.other = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.post = Post.objects.create(
+            text=constants.POST_TEXT,
+            author=cls.author,
+            image=SimpleUploadedFile('export.gif', SMALL_GIF, 'image/gif')
+        )
+        Post.objects.create(text=constants.POST_TEXT_2, author=cls.other)
+        Comment.objects.create(
+            post=cls.post, author=cls.author, text=constants.COMMENT_TEXT
+        )
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.other_client = Client()
+        cls.other_client.force_login(cls.other)
+        cls.url = reverse(
+            'posts:profile_export', kwargs={'username': cls.author.username}
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_jsonl_export_streams_posts_and_comments(self):
+        response = self.author_client.get(self.url)
+        rows = [
+            json.loads(line)
+            for line in self.content(response).decode().splitlines()
+        ]
+        self.assertEqual(
+            [(row['type'], row['text']) for row in rows],
+            [('post', constants.POST_TEXT),
+             ('comment', constants.COMMENT_TEXT)]
+        )
+
+    def test_csv_export(self):
+        response = self.author_client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(
+            io.StringIO(self.content(response).decode())
+        ))
+        self.assertEqual(rows[0]['id'], str(self.post.pk))
+        self.assertEqual(len(rows), 2)
+
+    def test_tar_export_contains_images(self):
+        response = self.author_client.get(self.url, {'format': 'tar'})
+        with tarfile.open(fileobj=io.BytesIO(self.content(response))) as tar:
+            self.assertEqual(
+                tar.getnames(),
+                ['posts.jsonl', f'media/{self.post.image.name}']
+            )
+            image = tar.extractfile(f'media/{self.post.image.name}')
+            self.assertEqual(image.read(), SMALL_GIF)
+
+    def test_tar_export_streams_large_images_in_chunks(self):
+        user = User.objects.create_user(username=constants.USER_NAME_3)
+        content = os.urandom(FILE_CHUNK_SIZE * 3 + 100)
+        post = Post.objects.create(
+            text=constants.POST_TEXT, author=user,
+            image=SimpleUploadedFile('large.gif', content, 'image/gif')
+        )
+        chunks = list(export_chunks(user, 'tar', post.image.storage))
+        self.assertLessEqual(
+            max(map(len, chunks)), FILE_CHUNK_SIZE + tarfile.RECORDSIZE
+        )
+        with tarfile.open(fileobj=io.BytesIO(b''.join(chunks))) as tar:
+            image = tar.extractfile(f'media/{post.image.name}')
+            self.assertEqual(image.read(), content)
+
+    def test_images_are_read_from_post_image_storage(self):
+        field = Post._meta.get_field('image')
+        storage = mock.Mock(wraps=field.storage)
+        output = os.path.join(TEMP_MEDIA_ROOT, 'export.tar')
+        with mock.patch.object(field, 'storage', storage):
+            self.content(
+                self.author_client.get(self.url, {'format': 'tar'})
+            )
+            call_command(
+                'export_yatube', constants.USER_NAME, format='tar',
+                output=output
+            )
+        self.assertEqual(
+            storage.open.call_args_list, [mock.call(self.post.image.name)] * 2
+        )
+
+    def test_other_users_cannot_export(self):
+        response = self.other_client.get(self.url)
+        self.assertRedirects(
+            response,
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username})
+        )
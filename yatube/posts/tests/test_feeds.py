@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Group, Post, User
+
+
+class FeedsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=constants.USER_NAME)
+        cls.other = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.group = Group.objects.create(
+            title=constants.GROUP_TITLE,
+            slug=constants.GROUP_SLUG,
+            description=constants.GROUP_DESCRIPTION,
+        )
+        cls.group_post = Post.objects.create(
+            text=constants.POST_TEXT, author=cls.author, group=cls.group
+        )
+        cls.other_post = Post.objects.create(
+            text=constants.POST_TEXT_2, author=cls.other
+        )
+        cls.guest = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_feeds_list_all_posts(self):
+        response = self.guest.get(reverse('posts:index_rss'))
+        self.assertEqual(
+            response['Content-Type'], 'application/rss+xml; charset=utf-8'
+        )
+        self.assertContains(response, constants.POST_TEXT)
+        self.assertContains(response, constants.POST_TEXT_2)
+        response = self.guest.get(reverse('posts:index_atom'))
+        self.assertContains(response, '<feed')
+
+    def test_group_and_author_feeds_are_filtered(self):
+        response = self.guest.get(
+            reverse('posts:group_rss', kwargs={'slug': self.group.slug})
+        )
+        self.assertContains(response, constants.GROUP_TITLE)
+        self.assertNotContains(response, constants.POST_TEXT_2)
+        response = self.guest.get(reverse(
+            'posts:profile_atom', kwargs={'username': self.other.username}
+        ))
+        self.assertContains(response, constants.POST_TEXT_2)
+        self.assertNotContains(response, constants.POST_TEXT)
+
+    def test_feed_is_cached_until_posts_change(self):
+        url = reverse('posts:index_rss')
+        first = self.guest.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.guest.get(url).content, first.content)
+        response = self.guest.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='совсем новый пост', author=self.author)
+        response = self.guest.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertContains(response, 'совсем новый пост')
+
+    def test_unknown_group_feed_is_404(self):
+        response = self.guest.get(
+            reverse('posts:group_rss', kwargs={'slug': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -6,6 +7,7 @@ from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from core.storage import content_storage
 from posts.tests import testmodule_constants as constants
 from posts.models import Comment, Group, Post, User
 from yatube import settings
@@ -65,7 +67,12 @@ class PostsFormsTests(TestCase):
             follow=True
         )
         post_order = Post.objects.order_by('id').last()
-        self.assertEqual(post_order.image.name, 'posts/' + 'image.gif')
+        self.assertEqual(
+            post_order.image.name,
+            content_storage.hashed_name(
+                'posts/image.gif', hashlib.sha256(self.small).hexdigest()
+            )
+        )
         self.assertRedirects(
             response,
             reverse('posts:profile', kwargs={'username': f'{self.user}'})
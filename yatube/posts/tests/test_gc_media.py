@@ -0,0 +1,102 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.storage import content_storage
+from posts.management.commands import gc_media
+from posts.tests import testmodule_constants as constants
+from posts.models import Post, User
+from yatube import settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+DAY = 24 * 60 * 60
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class GcMediaTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        self.kept = Post.objects.create(
+            text=constants.POST_TEXT,
+            author=self.user,
+            image=ContentFile(b'kept', name='kept.gif')
+        ).image.name
+        self.old = self.write('posts/ab.gif', b'old orphan', age=2 * DAY)
+        self.fresh = self.write('posts/fresh.gif', b'new')
+        os.utime(content_storage.path(self.kept), (0, 0))
+
+    def write(self, name, content, age=0):
+        path = content_storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+        return name
+
+    def gc(self, *args):
+        out = StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_reports_without_deleting(self):
+        out = self.gc('--dry-run')
+        self.assertIn('файлов 1, байт 10', out)
+        self.assertTrue(content_storage.exists(self.old))
+
+    def test_only_old_orphans_are_deleted(self):
+        self.gc()
+        self.assertFalse(content_storage.exists(self.old))
+        self.assertTrue(content_storage.exists(self.fresh))
+        self.assertTrue(content_storage.exists(self.kept))
+
+    def test_quarantine_moves_files(self):
+        quarantine = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, quarantine, ignore_errors=True)
+        self.gc('--quarantine', quarantine)
+        self.assertFalse(content_storage.exists(self.old))
+        self.assertTrue(os.path.exists(os.path.join(quarantine, self.old)))
+
+    def test_file_uploaded_again_after_listing_is_kept(self):
+        content = b'uploaded again'
+        name = self.write(
+            content_storage.hashed_name(
+                'posts/again.gif', hashlib.sha256(content).hexdigest()
+            ),
+            content, age=2 * DAY
+        )
+        listed = gc_media.orphans
+
+        def upload_after_listing(root, prefix):
+            found = list(listed(root, prefix))
+            self.assertIn(name, [path for path, entry in found])
+            Post.objects.create(
+                text=constants.POST_TEXT,
+                author=self.user,
+                image=ContentFile(content, name='again.gif')
+            )
+            yield from found
+
+        with mock.patch.object(gc_media, 'orphans', upload_after_listing):
+            self.gc()
+        self.assertTrue(content_storage.exists(name))
+        self.assertFalse(content_storage.exists(self.old))
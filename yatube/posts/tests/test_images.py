@@ -0,0 +1,112 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image, features
+
+from core.queue import run_pending
+from posts.tests import testmodule_constants as constants
+from posts.models import Post, User
+from yatube import settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def png(size):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (255, 0, 0)).save(buffer, 'png')
+    return SimpleUploadedFile('image.png', buffer.getvalue(), 'image/png')
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    PAGE_CACHE_TIMEOUT=0,
+    POST_IMAGE_VARIANTS={'feed': '100', 'detail': '200'},
+)
+class ImageVariantsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_variants_are_built_on_create_and_edit(self):
+        self.author_client.post(
+            reverse('posts:post_create'),
+            data={'text': constants.POST_TEXT, 'image': png((400, 300))}
+        )
+        post = Post.objects.get()
+        self.assertEqual(post.variants, {})
+        run_pending()
+        post.refresh_from_db()
+        self.assertEqual(post.variants['feed']['jpeg']['width'], 100)
+        self.assertEqual(post.variants['feed']['jpeg']['height'], 75)
+        self.assertEqual(post.variants['detail']['jpeg']['width'], 200)
+        if features.check('webp'):
+            self.assertTrue(
+                post.variants['detail']['webp']['url'].endswith('.webp')
+            )
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': constants.POST_TEXT, 'image': png((50, 40))}
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.variants, {})
+        run_pending()
+        post.refresh_from_db()
+        self.assertEqual(post.variants['detail']['jpeg']['width'], 50)
+
+    def test_cards_use_stored_variants(self):
+        post = Post.objects.create(
+            text=constants.POST_TEXT, author=self.user, image=png((400, 300))
+        )
+        run_pending()
+        post.refresh_from_db()
+        response = self.author_client.get(reverse('posts:index'))
+        feed = post.variants['feed']
+        self.assertContains(response, f'src="{feed["jpeg"]["url"]}"')
+        self.assertContains(response, 'width="100" height="75"')
+        self.assertContains(response, f'{feed["jpeg"]["url"]} 100w')
+        response = self.author_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        self.assertContains(response, 'width="200" height="150"')
+
+    def test_new_image_is_shown_before_variants_are_built(self):
+        post = Post.objects.create(
+            text=constants.POST_TEXT, author=self.user, image=png((400, 300))
+        )
+        run_pending()
+        post.refresh_from_db()
+        old_url = post.variants['feed']['jpeg']['url']
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': constants.POST_TEXT, 'image': png((50, 40))}
+        )
+        post.refresh_from_db()
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        ):
+            with self.subTest(url=url):
+                response = self.author_client.get(url)
+                self.assertNotContains(response, old_url)
+                self.assertContains(response, f'src="{post.image.url}"')
+
+    def test_missing_file_has_no_variants(self):
+        post = Post.objects.create(
+            text=constants.POST_TEXT, author=self.user, image='posts/no.jpg'
+        )
+        run_pending()
+        post.refresh_from_db()
+        self.assertEqual(post.variants, {})
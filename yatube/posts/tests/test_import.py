@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.tests import testmodule_constants as constants
+from posts.models import (
+    Comment, Follow, Group, Post, TimelineEntry, User, UserStats
+)
+from posts.search import matching_posts
+
+
+class ImportCommandTests(TestCase):
+
+    def run_import(self, rows, suffix='.jsonl', *args, stderr=None):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as stream:
+            stream.write(rows)
+        out = StringIO()
+        call_command('import_yatube', path, '--batch-size', '2', *args,
+                     stdout=out, stderr=stderr or StringIO())
+        return out.getvalue()
+
+    def test_jsonl_import_rebuilds_derived_data(self):
+        rows = [
+            {'type': 'user', 'username': constants.USER_NAME},
+            {'type': 'user', 'username': constants.USER_NAME_2},
+            {'type': 'group', 'slug': constants.GROUP_SLUG,
+             'title': constants.GROUP_TITLE},
+            {'type': 'post', 'id': 10, 'author': constants.USER_NAME_2,
+             'group': constants.GROUP_SLUG, 'text': constants.POST_TEXT,
+             'created': '2020-01-01T10:00:00'},
+            {'type': 'post', 'author': 'nobody', 'text': constants.POST_TEXT},
+            {'type': 'comment', 'post': 10, 'author': constants.USER_NAME,
+             'text': constants.COMMENT_TEXT},
+            {'type': 'comment', 'post': 99, 'author': constants.USER_NAME,
+             'text': constants.COMMENT_TEXT},
+            {'type': 'follow', 'user': constants.USER_NAME,
+             'author': constants.USER_NAME_2},
+            {'type': 'follow', 'user': constants.USER_NAME,
+             'author': constants.USER_NAME},
+        ]
+        out = self.run_import(
+            '\n'.join(json.dumps(row) for row in rows)
+        )
+        post = Post.objects.get(pk=10)
+        self.assertEqual(post.created.year, 2020)
+        self.assertEqual(post.group.slug, constants.GROUP_SLUG)
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        user = User.objects.get(username=constants.USER_NAME)
+        self.assertEqual(user.stats.following_count, 1)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=user, post=post).exists()
+        )
+        self.assertTrue(
+            matching_posts(Post.objects, constants.POST_TEXT).exists()
+        )
+        self.assertIn('в секунду', out)
+        self.assertIn('post: пропущено 1', out)
+
+    def test_csv_import_creates_missing_references(self):
+        self.run_import(
+            'type,author,group,text\n'
+            f'post,{constants.USER_NAME},{constants.GROUP_SLUG},'
+            f'{constants.POST_TEXT}\n',
+            '.csv', '--create-missing'
+        )
+        post = Post.objects.get()
+        self.assertEqual(post.author.username, constants.USER_NAME)
+        self.assertTrue(Group.objects.filter(slug=constants.GROUP_SLUG))
+        self.assertFalse(post.author.has_usable_password())
+
+    def test_malformed_rows_are_skipped_with_warnings(self):
+        User.objects.create_user(username=constants.USER_NAME)
+        rows = '\n'.join([
+            '{"type": "post", "author": "%s"' % constants.USER_NAME,
+            json.dumps({'type': 'post', 'author': constants.USER_NAME}),
+            json.dumps({'type': 'comment', 'post': 'x',
+                        'author': constants.USER_NAME, 'text': 'a'}),
+            json.dumps({'type': 'post', 'author': constants.USER_NAME,
+                        'text': constants.POST_TEXT, 'created': 'вчера'}),
+            json.dumps({'type': 'post', 'author': constants.USER_NAME,
+                        'text': constants.POST_TEXT}),
+        ])
+        err = StringIO()
+        out = self.run_import(rows, stderr=err)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertIn('Неверных строк: 4', out)
+        self.assertIn('Строка 2: нет полей text', err.getvalue())
+        self.assertIn('Строка 4: неверная дата', err.getvalue())
+
+    def test_counts_only_inserted_rows(self):
+        rows = '\n'.join(json.dumps(row) for row in [
+            {'type': 'user', 'username': constants.USER_NAME},
+            {'type': 'user', 'username': constants.USER_NAME_2},
+            {'type': 'post', 'id': 10, 'author': constants.USER_NAME,
+             'text': constants.POST_TEXT},
+            {'type': 'follow', 'user': constants.USER_NAME,
+             'author': constants.USER_NAME_2},
+        ])
+        self.run_import(rows)
+        out = self.run_import(rows)
+        for row_type in ('follow', 'post', 'user'):
+            self.assertIn(f'{row_type}: загружено 0', out)
+            self.assertIn(f'{row_type}: пропущено', out)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_rebuild_is_scoped_to_imported_data(self):
+        other = User.objects.create_user(username=constants.USER_NAME_2)
+        UserStats.objects.filter(user=other).update(posts_count=42)
+        self.run_import(json.dumps({
+            'type': 'post', 'author': constants.USER_NAME,
+            'text': constants.POST_TEXT,
+        }), '.jsonl', '--create-missing')
+        author = User.objects.get(username=constants.USER_NAME)
+        self.assertEqual(author.stats.posts_count, 1)
+        other.stats.refresh_from_db()
+        self.assertEqual(other.stats.posts_count, 42)
+        self.run_import('', '.jsonl', '--rebuild-all')
+        other.stats.refresh_from_db()
+        self.assertEqual(other.stats.posts_count, 0)
+
+    def test_several_comments_are_counted(self):
+        rows = [
+            {'type': 'user', 'username': constants.USER_NAME},
+            {'type': 'post', 'id': 10, 'author': constants.USER_NAME,
+             'text': constants.POST_TEXT},
+        ] + [
+            {'type': 'comment', 'post': 10, 'author': constants.USER_NAME,
+             'text': f'{constants.COMMENT_TEXT} {number}',
+             'created': f'2020-01-0{number + 1}T10:00:00'}
+            for number in range(3)
+        ]
+        self.run_import('\n'.join(json.dumps(row) for row in rows))
+        self.assertEqual(Post.objects.get(pk=10).comments_count, 3)
+
+    def test_large_import_falls_back_to_full_rebuild(self):
+        other = User.objects.create_user(username=constants.USER_NAME_2)
+        UserStats.objects.filter(user=other).update(posts_count=42)
+        self.run_import('\n'.join(json.dumps(row) for row in [
+            {'type': 'user', 'username': f'user{number}'}
+            for number in range(5)
+        ]), '.jsonl', '--affected-limit', '3')
+        other.stats.refresh_from_db()
+        self.assertEqual(other.stats.posts_count, 0)
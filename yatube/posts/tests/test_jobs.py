@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import queue
+from core.models import Job
+from posts.tests import testmodule_constants as constants
+from posts.models import User
+
+calls = []
+
+
+@queue.job
+def remember(value):
+    calls.append(value)
+
+
+@queue.job
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOB_RETRY_DELAY=10, JOB_MAX_ATTEMPTS=2)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_once_and_is_removed(self):
+        queue.enqueue(remember, 'a')
+        queue.enqueue(remember, 'b', countdown=60)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(calls, ['a'])
+        self.assertEqual(Job.objects.get().args, '["b"]')
+
+    def test_failed_job_is_retried_with_backoff_then_gives_up(self):
+        task = queue.enqueue(explode)
+        queue.run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Job.QUEUED)
+        self.assertEqual(task.attempts, 1)
+        self.assertIn('boom', task.last_error)
+        self.assertGreater(task.run_at, timezone.now() + timedelta(seconds=5))
+        Job.objects.update(run_at=timezone.now())
+        queue.run_pending()
+        task.refresh_from_db()
+        self.assertEqual(task.status, Job.FAILED)
+
+    def test_stale_running_job_is_requeued(self):
+        task = queue.enqueue(remember, 'c')
+        Job.objects.filter(pk=task.pk).update(
+            status=Job.RUNNING,
+            locked_at=timezone.now() - timedelta(days=1)
+        )
+        queue.run_pending()
+        self.assertEqual(calls, ['c'])
+
+    def test_run_jobs_command(self):
+        queue.enqueue(remember, 'd')
+        out = StringIO()
+        with mock.patch('core.management.commands.run_jobs.'
+                        'close_old_connections'):
+            call_command('run_jobs', '--once', '--workers', '1', stdout=out)
+        self.assertEqual(calls, ['d'])
+        self.assertIn('Выполнено задач: 1', out.getvalue())
+
+
+class PasswordResetJobTests(TestCase):
+
+    def test_reset_mail_is_sent_by_worker(self):
+        User.objects.create_user(
+            username=constants.USER_NAME,
+            email='user@example.com',
+            password='secret-password'
+        )
+        Client().post(
+            reverse('users:password_reset'), {'email': 'user@example.com'}
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
@@ -0,0 +1,59 @@
+import json
+import os
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from posts.management.commands.benchmark_db import Stats
+from posts.management.commands.loadtest import percentile
+from posts.models import Post, User
+from posts.tests.testmodule_snapshots import TempSnapshotDirMixin
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 11))
+        stats = Stats()
+        stats.timings = list(reversed(values))
+        for share, expected in ((0.5, 5), (0.95, 10), (0.1, 1), (1, 10)):
+            with self.subTest(share=share):
+                self.assertEqual(percentile(values, share), expected)
+                self.assertEqual(stats.percentile(share), expected)
+        self.assertEqual(percentile([7], 0.99), 7)
+        self.assertIsNone(percentile([], 0.5))
+
+
+class LoadTestCommandTests(TempSnapshotDirMixin, LiveServerTestCase):
+    def test_report(self):
+        out = StringIO()
+        call_command(
+            'loadtest', url=self.live_server_url, clients=1, duration=1,
+            logged_in=1, users=3, groups=1, posts=10, comments=5,
+            follows=2, stdout=out, stderr=StringIO()
+        )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertGreater(report['total']['requests'], 0)
+        for stats in report['routes'].values():
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+            self.assertEqual(
+                set(stats),
+                {'requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms'}
+            )
+
+    def test_existing_dataset_is_reused(self):
+        options = {
+            'url': self.live_server_url, 'clients': 1, 'duration': 0.2,
+            'logged_in': 0, 'users': 3, 'groups': 1, 'posts': 10,
+            'comments': 5, 'follows': 2, 'stdout': StringIO(),
+            'stderr': StringIO(),
+        }
+        call_command('loadtest', **options)
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 1)
+        Post.objects.create(text='лишний', author=User.objects.first())
+        call_command('loadtest', **options)
+        self.assertEqual(Post.objects.count(), 11)
+        call_command('loadtest', flush=True, **options)
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertFalse(Post.objects.filter(text='лишний').exists())
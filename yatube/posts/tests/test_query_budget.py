@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from core.queries import QueryStats, check_budget, collect_violations
+from posts import views
+from posts.tests import testmodule_constants as constants
+from posts.models import Comment, Follow, Group, Post, User
+from posts.stats import rebuild_all
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.author = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.group = Group.objects.create(
+            title=constants.GROUP_TITLE,
+            slug=constants.GROUP_SLUG,
+            description=constants.GROUP_DESCRIPTION,
+        )
+        for number in range(15):
+            cls.post = Post.objects.create(
+                author=cls.author, group=cls.group,
+                text=f'{constants.POST_TEXT} {number}'
+            )
+        for number in range(5):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=constants.POST_TEXT
+            )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        rebuild_all()
+
+    def setUp(self):
+        self.user_client = Client()
+        self.user_client.force_login(self.user)
+
+    def test_pages_fit_budgets(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:post_comments',
+                    kwargs={'post_id': self.post.pk}),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=' + constants.POST_TEXT,
+            reverse('posts:profile_unfollow',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:profile_follow',
+                    kwargs={'username': self.author.username}),
+        )
+        with collect_violations() as violations:
+            for client in (self.client, self.user_client):
+                for url in urls:
+                    with self.subTest(url=url):
+                        client.get(url)
+        self.assertEqual(violations, [])
+
+    def test_writes_fit_budgets(self):
+        for number in range(5):
+            follower = User.objects.create_user(username=f'follower{number}')
+            Follow.objects.create(user=follower, author=self.user)
+        post = Post.objects.create(author=self.user, text=constants.POST_TEXT)
+        edit_url = reverse('posts:post_edit', kwargs={'post_id': post.pk})
+        with collect_violations() as violations:
+            self.user_client.post(reverse('posts:post_create'), {
+                'text': constants.POST_TEXT, 'group': self.group.pk
+            })
+            self.user_client.get(edit_url)
+            self.user_client.post(edit_url, {
+                'text': constants.POST_TEXT_2, 'group': self.group.pk
+            })
+            self.user_client.post(
+                reverse('posts:add_comment', kwargs={'post_id': post.pk}),
+                {'text': constants.COMMENT_TEXT}
+            )
+        self.assertEqual(violations, [])
+
+    def test_stats_recorded_on_request(self):
+        response = self.user_client.get(reverse('posts:index'))
+        stats = response.wsgi_request.query_stats
+        self.assertGreater(stats.count, 0)
+        self.assertGreaterEqual(stats.duration, 0)
+
+    def test_violation_reported(self):
+        with mock.patch.dict(views.index.query_budget, queries=0):
+            with collect_violations() as violations, \
+                    self.assertLogs('core.queries', 'WARNING'):
+                self.user_client.get(reverse('posts:index'))
+        self.assertEqual(len(violations), 1)
+        self.assertIn('posts:index', violations[0])
+
+    def test_repeated_query_detected(self):
+        stats = QueryStats()
+        with stats.record():
+            for post in Post.objects.all()[:5]:
+                User.objects.get(pk=post.author_id)
+        problems = check_budget({'queries': 100, 'repeats': 3}, stats)
+        self.assertEqual(len(problems), 1)
+        self.assertIn('N+1: 5', problems[0])
+        self.assertEqual(stats.count, 6)
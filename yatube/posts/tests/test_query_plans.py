@@ -0,0 +1,93 @@
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def bad_steps(plan):
+    """Шаги плана с полным просмотром таблицы или сортировкой.
+
+    Ранжирование полнотекстового поиска по bm25 индекс дать не может,
+    поэтому сортировка результатов FTS5 допустима.
+    """
+    ranked = any('VIRTUAL TABLE' in step for step in plan)
+    return [
+        step for step in plan
+        if ('TEMP B-TREE' in step and not ranked)
+        or (
+            step.startswith('SCAN')
+            and 'INDEX' not in step
+            and 'VIRTUAL TABLE' not in step
+        )
+    ]
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class QueryPlanTests(TestCase):
+    """Запросы горячих страниц идут по индексам, без полных просмотров
+    и временных B-деревьев для сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.author = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.group = Group.objects.create(
+            title=constants.GROUP_TITLE,
+            slug=constants.GROUP_SLUG,
+            description=constants.GROUP_DESCRIPTION,
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(30):
+            post = Post.objects.create(
+                text=f'{constants.POST_TEXT} {i}',
+                group=cls.group if i % 2 else None,
+                author=cls.author if i % 3 else cls.user
+            )
+            Comment.objects.create(
+                post=post, author=cls.user, text=constants.COMMENT_TEXT
+            )
+        cls.post = post
+
+    def urls(self):
+        first = self.authorized_client.get(reverse('posts:index'))
+        after = {'after': first.context['page_obj'].next_cursor}
+        yield reverse('posts:index'), {}
+        yield reverse('posts:index'), after
+        yield reverse('posts:index'), {'page': 2}
+        yield reverse(
+            'posts:group_list', kwargs={'slug': self.group.slug}
+        ), after
+        yield reverse(
+            'posts:profile', kwargs={'username': self.author.username}
+        ), after
+        yield reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        ), {}
+        yield reverse(
+            'posts:post_comments', kwargs={'post_id': self.post.pk}
+        ), {}
+        yield reverse('posts:follow_index'), after
+        yield reverse('posts:search'), {'q': constants.POST_TEXT}
+
+    def test_views_use_indexes(self):
+        for url, params in self.urls():
+            with CaptureQueriesContext(connection) as queries:
+                self.authorized_client.get(url, params)
+            for query in queries:
+                if not query['sql'].lstrip().startswith('SELECT'):
+                    continue
+                with self.subTest(url=url, params=params, sql=query['sql']):
+                    plan = query_plan(query['sql'])
+                    self.assertEqual(bad_steps(plan), [], plan)
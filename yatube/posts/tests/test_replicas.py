@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.db import connections
+from django.test import (
+    TestCase, TransactionTestCase, Client, override_settings
+)
+from django.urls import reverse
+
+from core import db
+from core.cache import bump
+from posts.tests import testmodule_constants as constants
+from posts.models import Group, Post, User
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = db.ReplicaRouter()
+        self.addCleanup(db.state.__dict__.clear)
+
+    def test_reads_go_to_default_outside_request(self):
+        with mock.patch('core.db.replica_lag', return_value=0):
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_reads_go_to_one_fresh_replica(self):
+        db.state.use_replica = True
+        with mock.patch('core.db.replica_lag', side_effect=[100, 1]):
+            self.assertEqual(self.router.db_for_read(Post), 'replica2')
+            self.assertEqual(self.router.db_for_read(User), 'replica2')
+
+    def test_stale_replicas_are_skipped(self):
+        db.state.use_replica = True
+        with mock.patch('core.db.replica_lag', side_effect=[100, None]):
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_write_switches_reads_to_default(self):
+        db.state.use_replica = True
+        with mock.patch('core.db.replica_lag', return_value=0):
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_migrations_skip_replicas(self):
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+
+
+class ReplicaMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def test_write_pins_to_primary(self):
+        response = self.author_client.post(
+            reverse('posts:post_create'), {'text': constants.POST_TEXT}
+        )
+        self.assertIn(db.PIN_COOKIE, response.cookies)
+
+    def test_read_does_not_pin(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(db.PIN_COOKIE, response.cookies)
+
+    def test_pinned_request_does_not_use_replicas(self):
+        seen = []
+
+        def view(request):
+            seen.append(db.state.use_replica)
+            return mock.Mock(set_cookie=mock.Mock())
+
+        middleware = db.ReplicaMiddleware(view)
+        middleware(mock.Mock(method='GET', COOKIES={}))
+        middleware(mock.Mock(method='GET', COOKIES={db.PIN_COOKIE: '1'}))
+        self.assertEqual(seen, [True, False])
+
+
+class ReplicaSyncTests(TransactionTestCase):
+    # backup API ждёт конца транзакции, поэтому без TestCase
+    def test_heartbeat_is_read_back(self):
+        synced = db.beat()
+        self.assertEqual(db.read_heartbeat('default'), synced)
+
+    def test_copy_database(self):
+        User.objects.create_user(username=constants.USER_NAME)
+        with tempfile.TemporaryDirectory() as directory:
+            target = os.path.join(directory, 'replica.sqlite3')
+            db.copy_database(target)
+            copy = sqlite3.connect(target)
+            try:
+                names = copy.execute(
+                    'SELECT username FROM auth_user'
+                ).fetchall()
+            finally:
+                copy.close()
+        self.assertEqual(names, [(constants.USER_NAME, )])
+
+
+class LaggingReplicaTests(TransactionTestCase):
+    """Копия базы, не видевшая последней записи, но ещё в пределах
+    REPLICA_MAX_LAG."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username=constants.USER_NAME)
+        self.group = Group.objects.create(
+            title=constants.GROUP_TITLE,
+            slug=constants.GROUP_SLUG,
+            description=constants.GROUP_DESCRIPTION,
+        )
+        Post.objects.create(text=constants.POST_TEXT, author=self.author)
+        db.beat()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        target = os.path.join(directory.name, 'replica.sqlite3')
+        db.copy_database(target)
+        connections.databases['lagging'] = dict(
+            connections.databases['default'], NAME=target
+        )
+        self.addCleanup(connections.databases.pop, 'lagging')
+        self.addCleanup(self.close_replica)
+        db.heartbeats.clear()
+        self.addCleanup(db.heartbeats.clear)
+        Post.objects.create(
+            text=constants.POST_TEXT_2,
+            author=self.author,
+            group=self.group,
+        )
+
+    def close_replica(self):
+        connections['lagging'].close()
+        del connections['lagging']
+
+    @override_settings(DATABASE_REPLICAS=['lagging'])
+    def test_cached_pages_are_read_from_primary(self):
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[constants.GROUP_SLUG]),
+            reverse('posts:profile', args=[constants.USER_NAME]),
+        ):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                again = self.client.get(url)
+                self.assertContains(first, constants.POST_TEXT_2)
+                self.assertContains(again, constants.POST_TEXT_2)
+
+    @override_settings(DATABASE_REPLICAS=['lagging'])
+    def test_fresh_replica_is_used(self):
+        db.state.use_replica = True
+        self.addCleanup(db.state.__dict__.clear)
+        with mock.patch('core.db.last_modified', return_value=0):
+            db.ensure_fresh('posts')
+        self.assertTrue(db.state.use_replica)
+        self.assertEqual(db.ReplicaRouter().db_for_read(Post), 'lagging')
+        bump('posts')
+        db.ensure_fresh('posts')
+        self.assertFalse(db.state.use_replica)
@@ -0,0 +1,68 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Post, User
+
+
+class SearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username=constants.USER_NAME,
+            email='admin@example.com',
+            password='password'
+        )
+        cls.client = Client()
+        cls.cat = Post.objects.create(
+            text='Котики <b>спят</b> на солнце', author=cls.user
+        )
+        cls.dog = Post.objects.create(text='Собака лает', author=cls.user)
+        for i in range(12):
+            Post.objects.create(text=f'Песня номер {i}', author=cls.user)
+
+    def search(self, query, **params):
+        return self.client.get(reverse('posts:search'), {'q': query, **params})
+
+    def test_search_finds_by_prefix_and_highlights(self):
+        response = self.search('кот')
+        page_obj = response.context['page_obj']
+        self.assertEqual([post.pk for post in page_obj], [self.cat.pk])
+        self.assertIn('<mark>Котики</mark>', page_obj[0].snippet)
+        self.assertIn('&lt;b&gt;', page_obj[0].snippet)
+
+    def test_search_pages_with_cursor(self):
+        first = self.search('песня').context['page_obj']
+        self.assertEqual(len(first), 10)
+        second = self.search('песня', after=first.next_cursor)
+        second = second.context['page_obj']
+        self.assertEqual(len(second), 2)
+        self.assertFalse(
+            {post.pk for post in first} & {post.pk for post in second}
+        )
+
+    def test_index_follows_edits_and_deletes(self):
+        self.dog.text = 'Кошка мяукает'
+        self.dog.save()
+        self.assertFalse(self.search('собака').context['page_obj'])
+        self.assertTrue(self.search('кошка').context['page_obj'])
+        self.dog.delete()
+        self.assertFalse(self.search('кошка').context['page_obj'])
+
+    def test_empty_query(self):
+        response = self.search('  ')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['page_obj'])
+
+    def test_admin_uses_index(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'котик'}
+        )
+        self.assertEqual(
+            [post.pk for post in response.context['cl'].result_list],
+            [self.cat.pk]
+        )
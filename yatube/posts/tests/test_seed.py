@@ -0,0 +1,72 @@
+import random
+import statistics
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+
+from posts.dataset import Generator
+from posts.models import Comment, Follow, Post, User, UserStats
+from posts.tests.testmodule_snapshots import TempSnapshotDirMixin
+
+COUNTS = {
+    'users': 200, 'groups': 5, 'posts': 2000, 'comments': 1000,
+    'follows': 2000,
+}
+
+
+class SeedCommandTests(TempSnapshotDirMixin, TransactionTestCase):
+    # Снимок копируется backup API, которому мешает транзакция TestCase.
+
+    def seed(self, **options):
+        out = StringIO()
+        call_command(
+            'seed', batch_size=500, stdout=out, **{**COUNTS, **options}
+        )
+        return out.getvalue()
+
+    def test_generates_skewed_dataset(self):
+        self.seed()
+        self.assertEqual(User.objects.count(), COUNTS['users'])
+        self.assertEqual(Post.objects.count(), COUNTS['posts'])
+        self.assertEqual(Comment.objects.count(), COUNTS['comments'])
+        self.assertGreater(Follow.objects.count(), COUNTS['follows'] // 2)
+        followers = sorted(
+            UserStats.objects.values_list('followers_count', flat=True)
+        )
+        self.assertGreater(
+            followers[-1], 5 * max(statistics.median(followers), 1)
+        )
+        self.assertEqual(
+            Post.objects.aggregate(total=Sum('comments_count'))['total'],
+            COUNTS['comments']
+        )
+
+    def test_snapshot_restored(self):
+        self.assertIn(self.snapshot_dir, self.seed())
+        call_command('flush', interactive=False, verbosity=0)
+        self.assertIn('восстановлен', self.seed())
+        self.assertEqual(Post.objects.count(), COUNTS['posts'])
+
+    def test_refuses_non_empty_database(self):
+        User.objects.create_user(username='existing')
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed(flush=True)
+        call_command('flush', interactive=False, verbosity=0)
+        User.objects.create_user(username='existing')
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.assertTrue(User.objects.filter(username='existing').exists())
+
+
+class GeneratorTests(TestCase):
+
+    def test_usernames_do_not_collide(self):
+        generator = Generator(random.Random(0))
+        # Без разделителя abc1 + 12 совпало бы с abc11 + 2.
+        generator.names = ['abc1', 'abc11']
+        generator.users(30)
+        self.assertEqual(User.objects.count(), 30)
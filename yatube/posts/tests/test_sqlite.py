@@ -0,0 +1,94 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+
+from core.sqlite import current_pragmas
+from posts.tests import testmodule_constants as constants
+from posts.management.commands.benchmark_db import PHASES
+from posts.models import Comment, Post, User
+from posts.tests.testmodule_snapshots import TempSnapshotDirMixin
+
+
+class SqlitePragmaTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        self.assertEqual(
+            current_pragmas(connection, ('synchronous', 'busy_timeout')),
+            {'synchronous': 1, 'busy_timeout': 5000}
+        )
+
+    def test_file_database_switches_to_wal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = connections['default'].__class__(
+                {
+                    **connection.settings_dict,
+                    'NAME': os.path.join(directory, 'db.sqlite3'),
+                },
+                alias='pragma_test'
+            )
+            try:
+                wrapper.ensure_connection()
+                pragmas = current_pragmas(wrapper, ('journal_mode', ))
+            finally:
+                wrapper.close()
+        self.assertEqual(pragmas, {'journal_mode': 'wal'})
+
+
+class BenchmarkCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        Post.objects.create(author=cls.user, text=constants.POST_TEXT)
+
+    def test_runs_both_phases_and_cleans_up(self):
+        existing = User.objects.create_user(username='benchmark_db')
+        out = StringIO()
+        call_command(
+            'benchmark_db', threads=1, writers=1, seconds=0.2, stdout=out
+        )
+        output = out.getvalue()
+        self.assertIn('baseline', output)
+        self.assertIn('tuned', output)
+        self.assertIn('Пропускная способность', output)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            list(User.objects.filter(username__startswith='benchmark_db')),
+            [existing]
+        )
+
+    def test_baseline_does_not_wait_for_locks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = connections['default'].__class__(
+                {
+                    **connection.settings_dict,
+                    **PHASES['baseline'],
+                    'NAME': os.path.join(directory, 'db.sqlite3'),
+                },
+                alias='baseline_test'
+            )
+            try:
+                wrapper.ensure_connection()
+                pragmas = current_pragmas(wrapper, ('busy_timeout', ))
+            finally:
+                wrapper.close()
+        self.assertEqual(pragmas, {'busy_timeout': 0})
+
+
+class BenchmarkSnapshotTests(TempSnapshotDirMixin, TransactionTestCase):
+    # Снимок восстанавливается backup API, которому мешает
+    # транзакция TestCase.
+
+    def test_restores_seed_snapshot(self):
+        out = StringIO()
+        call_command(
+            'benchmark_db', snapshot=True, users=5, groups=1, posts=20,
+            comments=10, follows=5, threads=1, writers=0, seconds=0.1,
+            phase='tuned', stdout=out
+        )
+        self.assertIn(self.snapshot_dir, out.getvalue())
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 1)
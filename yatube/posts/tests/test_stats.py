@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Follow, Post, User, UserStats
+from posts.stats import get_stats
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class UserStatsTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.author = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.client = Client()
+
+    def test_counters_follow_signals(self):
+        get_stats(self.author)
+        get_stats(self.user)
+        post = Post.objects.create(text=constants.POST_TEXT,
+                                   author=self.author)
+        Post.objects.create(text=constants.POST_TEXT, author=self.author)
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        stats = get_stats(self.author)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(get_stats(self.user).following_count, 1)
+        post.delete()
+        follow.delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.followers_count, 0)
+        self.assertEqual(get_stats(self.user).following_count, 0)
+
+    def test_missing_stats_are_counted_without_writes(self):
+        Post.objects.create(text=constants.POST_TEXT, author=self.author)
+        Follow.objects.create(user=self.user, author=self.author)
+        UserStats.objects.filter(user=self.author).delete()
+        stats = get_stats(self.author)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertFalse(UserStats.objects.filter(user=self.author))
+
+    def test_counters_do_not_go_below_zero(self):
+        post = Post.objects.create(text=constants.POST_TEXT,
+                                   author=self.author)
+        UserStats.objects.filter(user=self.author).update(posts_count=0)
+        post.delete()
+        self.assertEqual(get_stats(self.author).posts_count, 0)
+
+    def test_rebuild_command_fixes_drift(self):
+        Post.objects.create(text=constants.POST_TEXT, author=self.author)
+        get_stats(self.author)
+        UserStats.objects.filter(user=self.author).update(posts_count=42)
+        call_command('rebuild_user_stats', stdout=StringIO())
+        self.assertEqual(get_stats(self.author).posts_count, 1)
+
+    def test_profile_header_does_not_count(self):
+        Post.objects.create(text=constants.POST_TEXT, author=self.author)
+        url = reverse(
+            'posts:profile', kwargs={'username': self.author.username}
+        )
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertNotIn(
+            'COUNT(', ' '.join(query['sql'] for query in queries)
+        )
+        self.assertEqual(response.context['author_stats'].posts_count, 1)
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from core.models import StoredFile
+from core.storage import content_storage
+from posts.tests import testmodule_constants as constants
+from posts.models import Post, User
+from yatube import settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\x00\xFF\x00')
+
+
+def upload(content=SMALL_GIF, name='picture.GIF'):
+    return SimpleUploadedFile(name, content, 'image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create(self, image):
+        return Post.objects.create(
+            text=constants.POST_TEXT, author=self.user, image=image
+        )
+
+    def test_identical_uploads_share_one_sharded_file(self):
+        digest = hashlib.sha256(SMALL_GIF).hexdigest()
+        first = self.create(upload())
+        second = self.create(upload(name='copy.gif'))
+        self.assertEqual(
+            first.image.name, f'posts/{digest[:2]}/{digest[2:4]}/{digest}.gif'
+        )
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertEqual(StoredFile.objects.get(name=first.image.name).refs, 2)
+        directory = os.path.dirname(content_storage.path(first.image.name))
+        self.assertEqual(os.listdir(directory), [f'{digest}.gif'])
+
+    def test_file_is_deleted_with_last_reference(self):
+        first = self.create(upload())
+        second = self.create(upload())
+        name = first.image.name
+        first.delete()
+        self.assertTrue(content_storage.exists(name))
+        second.image = upload(OTHER_GIF)
+        second.save()
+        self.assertFalse(content_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+        self.assertTrue(content_storage.exists(second.image.name))
+
+    def test_reuploading_same_image_keeps_one_reference(self):
+        post = self.create(upload())
+        post.image = upload(name='again.gif')
+        post.save()
+        self.assertEqual(StoredFile.objects.get(name=post.image.name).refs, 1)
+        post.delete()
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_unknown_files_are_not_released(self):
+        content_storage.save('legacy.gif', upload())
+        Post.objects.create(
+            text=constants.POST_TEXT, author=self.user, image='posts/old.gif'
+        ).delete()
+        self.assertEqual(StoredFile.objects.get().refs, 1)
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core import template_profiler
+from core.models import TemplateTiming
+from posts.tests import testmodule_constants as constants
+from posts.models import Post, User
+
+
+class TemplateProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        for number in range(3):
+            Post.objects.create(
+                author=cls.user, text=f'{constants.POST_TEXT} {number}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        template_profiler.install()
+        self.addCleanup(template_profiler.uninstall)
+
+    def test_templates_and_includes_recorded(self):
+        self.client.get(reverse('posts:index'))
+        template_profiler.flush(force=True)
+        page = TemplateTiming.objects.get(name='posts/index.html')
+        self.assertEqual(page.kind, TemplateTiming.TEMPLATE)
+        self.assertEqual(page.calls, 1)
+        self.assertGreaterEqual(page.total, page.own)
+        cycle = TemplateTiming.objects.get(
+            kind=TemplateTiming.INCLUDE, name__contains='posts_cycle.html'
+        )
+        self.assertTrue(cycle.name.startswith('posts/index.html:'))
+        self.assertEqual(cycle.calls, 1)
+        self.assertEqual(
+            TemplateTiming.objects.get(
+                name='posts/includes/post_card.html'
+            ).calls,
+            3
+        )
+
+    def test_counters_accumulate_across_requests(self):
+        # Анонимам страница отдаётся из кэша без рендеринга.
+        self.client.force_login(self.user)
+        for _ in range(2):
+            self.client.get(
+                reverse('posts:profile',
+                        kwargs={'username': self.user.username})
+            )
+            template_profiler.flush(force=True)
+        self.assertEqual(
+            TemplateTiming.objects.get(name='posts/profile.html').calls, 2
+        )
+
+    def test_report_command(self):
+        self.client.get(reverse('posts:index'))
+        template_profiler.flush(force=True)
+        out = StringIO()
+        call_command('template_profile', sort='total', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn('шаблон', lines[0])
+        self.assertTrue(lines[1].endswith('posts/index.html'))
+        call_command('template_profile', reset=True, stdout=StringIO())
+        self.assertFalse(TemplateTiming.objects.exists())
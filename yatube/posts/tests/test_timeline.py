@@ -0,0 +1,68 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from posts.tests import testmodule_constants as constants
+from posts.models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        cls.author = User.objects.create_user(username=constants.USER_NAME_2)
+        cls.other = User.objects.create_user(username=constants.USER_NAME_3)
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        for i in range(3):
+            Post.objects.create(text=constants.POST_TEXT, author=cls.author)
+
+    def follow(self, username):
+        self.authorized_client.get(
+            reverse('posts:profile_follow', kwargs={'username': username})
+        )
+
+    def feed(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return [post.pk for post in response.context['page_obj']]
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        self.follow(self.author.username)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.user).count(), 3
+        )
+        self.authorized_client.get(
+            reverse(
+                'posts:profile_unfollow',
+                kwargs={'username': self.author.username}
+            )
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user))
+
+    def test_new_post_is_fanned_out(self):
+        self.follow(self.author.username)
+        post = Post.objects.create(text=constants.POST_TEXT_2,
+                                   author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists()
+        )
+        self.assertEqual(self.feed()[0], post.pk)
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=0)
+    def test_heavy_author_is_merged_on_read(self):
+        self.follow(self.author.username)
+        self.follow(self.other.username)
+        Post.objects.create(text=constants.POST_TEXT_2, author=self.author)
+        Post.objects.create(text=constants.POST_TEXT_2, author=self.other)
+        self.assertFalse(
+            Follow.objects.filter(user=self.user, fanout=True).exists()
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user))
+        expected = list(
+            Post.objects
+            .filter(author__in=(self.author, self.other))
+            .order_by('-created', '-id')
+            .values_list('pk', flat=True)
+        )
+        self.assertEqual(self.feed(), expected)
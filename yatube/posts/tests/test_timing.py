@@ -0,0 +1,68 @@
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import timing
+from posts.tests import testmodule_constants as constants
+from posts.models import Post, User
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=constants.USER_NAME)
+        Post.objects.create(author=cls.user, text=constants.POST_TEXT)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse(
+            'posts:profile', kwargs={'username': self.user.username}
+        )
+
+    def metrics(self, response):
+        return {
+            name: (float(duration), description)
+            for name, duration, description in re.findall(
+                r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?',
+                response['Server-Timing']
+            )
+        }
+
+    def test_header_has_all_layers(self):
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            response = self.client.get(self.url)
+        metrics = self.metrics(response)
+        self.assertEqual(set(metrics), {'db', 'cache', 'tpl', 'total'})
+        self.assertGreater(metrics['tpl'][0], 0)
+        self.assertRegex(metrics['db'][1], r'\([1-9]\d*\)$')
+        self.assertRegex(metrics['cache'][1], r'\([1-9]\d*\)$')
+        self.assertLessEqual(metrics['tpl'][0], metrics['total'][0])
+        self.assertIn('view=posts:profile', logs.output[0])
+        self.assertIn('status=200', logs.output[0])
+
+    def test_cached_page_skips_templates(self):
+        self.client.get(self.url)
+        metrics = self.metrics(self.client.get(self.url))
+        self.assertEqual(metrics['tpl'][1], 'Templates (0)')
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Server-Timing', response)
+
+    def test_outside_request_not_measured(self):
+        self.assertIsNone(timing.current())
+        with timing.timed('db'):
+            pass
+        self.assertIsNone(timing.current())
+
+    def test_nested_calls_counted_once(self):
+        timing.local.timings = timings = timing.Timings()
+        try:
+            cache.get_many(['a', 'b', 'c'])
+        finally:
+            timing.local.timings = None
+        self.assertEqual(timings.counts['cache'], 1)
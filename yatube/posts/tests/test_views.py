@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -7,7 +8,10 @@ from django.forms import fields
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from core.storage import content_storage
 from posts.tests import testmodule_constants as constants
 from posts.models import Follow, Group, Post, User
 from yatube import settings
@@ -37,6 +41,9 @@ class PostsViewTests(TestCase):
             content=cls.small_gif,
             content_type='image/gif'
         )
+        cls.image_name = content_storage.hashed_name(
+            'posts/small.gif', hashlib.sha256(cls.small_gif).hexdigest()
+        )
 
         cls.group = Group.objects.create(
             title=constants.GROUP_TITLE,
@@ -98,7 +105,7 @@ class PostsViewTests(TestCase):
         self.assertEqual(text, 'Тестовый текст')
         self.assertEqual(group.title, 'Тестовый заголовок')
         self.assertEqual(author, self.user)
-        self.assertEqual(image.name, 'posts/' + self.image.name)
+        self.assertEqual(image.name, self.image_name)
 
     def test_group_list_page_show_correct_context(self):
         """Шаблон group_list сформирован с правильным контекстом."""
@@ -116,7 +123,7 @@ class PostsViewTests(TestCase):
         self.assertEqual(text, 'Тестовый текст')
         self.assertEqual(group.slug, constants.GROUP_SLUG)
         self.assertEqual(author, self.user)
-        self.assertEqual(image.name, 'posts/' + self.image.name)
+        self.assertEqual(image.name, self.image_name)
 
     def test_profile_page_show_correct_context(self):
         """Шаблон profile сформирован с правильным контекстом."""
@@ -131,7 +138,7 @@ class PostsViewTests(TestCase):
         self.assertEqual(text, 'Тестовый текст')
         self.assertEqual(group.slug, constants.GROUP_SLUG)
         self.assertEqual(author, self.user.username)
-        self.assertEqual(image.name, 'posts/' + self.image.name)
+        self.assertEqual(image.name, self.image_name)
 
     def test_post_detail_pages_show_correct_context(self):
         """Шаблон post_detail сформирован с правильным контекстом."""
@@ -148,7 +155,7 @@ class PostsViewTests(TestCase):
             response.context.get('post').author.username, self.user.username
         )
         self.assertEqual(
-            response.context.get('post').image.name, 'posts/' + self.image.name
+            response.context.get('post').image.name, self.image_name
         )
 
     def test_post_create_show_correct_context(self):
@@ -182,7 +189,7 @@ class PostsViewTests(TestCase):
         first_object = response.context['page_obj'][0]
         key = make_template_fragment_key(
             'index_page',
-            [response.context['page_obj']]
+            [response.context['cache_key']]
         )
         self.assertTrue(first_object)
         Post.objects.all().delete()
@@ -193,6 +200,7 @@ class PostsViewTests(TestCase):
         self.assertFalse(cache.get(key))
 
 
+@override_settings(PAGE_CACHE_TIMEOUT=0)
 class PaginatorViewsTest(TestCase):
 
     @classmethod
@@ -260,6 +268,47 @@ class PaginatorViewsTest(TestCase):
         ) + '?page=3'))
         self.assertEqual(len(response.context['page_obj']), 6)
 
+    def test_cursor_pages_walk_whole_feed(self):
+        url = reverse('posts:index')
+        seen = []
+        response = self.client.get(url)
+        while True:
+            page_obj = response.context['page_obj']
+            seen.extend(post.pk for post in page_obj)
+            if not page_obj.next_cursor:
+                break
+            response = self.client.get(
+                url, {'after': page_obj.next_cursor}
+            )
+        expected = list(
+            Post.objects.order_by('-created', '-id')
+            .values_list('pk', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_cursor_previous_page_and_bad_cursor(self):
+        url = reverse('posts:index')
+        first = self.client.get(url).context['page_obj']
+        second = self.client.get(
+            url, {'after': first.next_cursor}
+        ).context['page_obj']
+        back = self.client.get(
+            url, {'before': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.previous_cursor)
+        broken = self.client.get(url, {'after': 'broken'})
+        self.assertEqual(list(broken.context['page_obj']), list(first))
+
+    def test_cursor_page_does_not_count(self):
+        url = reverse('posts:index')
+        first = self.client.get(url).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'after': first.next_cursor})
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
 
 class FollowViewsTest(TestCase):
 
@@ -0,0 +1,19 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+class TempSnapshotDirMixin:
+    """Снимки `seed` пишутся во временный каталог теста,
+    а не в SEED_SNAPSHOT_DIR."""
+
+    def setUp(self):
+        super().setUp()
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.snapshot_dir)
+        snapshot_settings = override_settings(
+            SEED_SNAPSHOT_DIR=self.snapshot_dir
+        )
+        snapshot_settings.enable()
+        self.addCleanup(snapshot_settings.disable)
@@ -0,0 +1,155 @@
+"""Материализованная лента подписок (fan-out on write).
+
+Посты автора раскладываются по лентам подписчиков при публикации.
+Если подписчиков у автора больше `FOLLOW_FANOUT_LIMIT`, автор
+переводится на чтение при запросе: его посты подмешиваются в ленту
+слиянием по тому же курсору (created, id).
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+
+from core.paginator import CursorPaginator, MergedCursorPaginator
+from .models import Follow, Post, TimelineEntry
+
+BACKFILL_BATCH_SIZE = 500
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорный пагинатор по записям ленты, отдающий посты."""
+
+    def __init__(self, user, per_page):
+        super().__init__(
+            TimelineEntry.objects
+            .filter(user=user)
+            .select_related('post__author', 'post__group'),
+            per_page,
+            key=('created', 'post_id')
+        )
+
+    def fetch(self, cursor, descending, stop, start=0):
+        return [
+            (key, entry.post)
+            for key, entry in super().fetch(cursor, descending, stop, start)
+        ]
+
+
+def follow_paginator(user, per_page):
+    """Пагинатор ленты подписок пользователя."""
+    paginator = TimelinePaginator(user, per_page)
+    pulled = list(
+        Follow.objects
+        .filter(user=user, fanout=False)
+        .values_list('author_id', flat=True)
+    )
+    if not pulled:
+        return paginator
+    return MergedCursorPaginator(
+        [
+            paginator,
+            CursorPaginator(
+                Post.objects
+                .filter(author_id__in=pulled)
+                .select_related('author', 'group'),
+                per_page
+            ),
+        ],
+        per_page
+    )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    limit = settings.FOLLOW_FANOUT_LIMIT
+    follows = Follow.objects.filter(author_id=post.author_id, fanout=True)
+    if follows.values_list('pk', flat=True)[limit:limit + 1]:
+        switch_to_pull(post.author_id)
+        return
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                post=post,
+                author_id=post.author_id,
+                created=post.created,
+            )
+            for user_id in follows.values_list('user_id', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def switch_to_pull(author_id):
+    """Переводит автора на подмешивание постов при чтении ленты."""
+    TimelineEntry.objects.filter(author_id=author_id).delete()
+    Follow.objects.filter(author_id=author_id).update(fanout=False)
+
+
+def backfill(follow):
+    """Заполняет ленту подписчика постами автора после подписки."""
+    pulled = Follow.objects.filter(author_id=follow.author_id, fanout=False)
+    if pulled.exists():
+        Follow.objects.filter(pk=follow.pk).update(fanout=False)
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=follow.user_id,
+                post_id=pk,
+                author_id=follow.author_id,
+                created=created,
+            )
+            for pk, created in Post.objects
+            .filter(author_id=follow.author_id)
+            .values_list('pk', 'created')
+            .iterator()
+        ),
+        batch_size=BACKFILL_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune(follow):
+    """Убирает посты автора из ленты после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, author_id=follow.author_id
+    ).delete()
+
+
+def rebuild(user_ids=None):
+    """Перестраивает ленты по подпискам.
+
+    Нужна после массовой загрузки, которая обходит сигналы. Если
+    переданы `user_ids`, перестраиваются только ленты этих читателей.
+    """
+    follows = Follow.objects.all()
+    entries = TimelineEntry.objects.all()
+    condition, params = '', []
+    if user_ids is not None:
+        params = list(user_ids)
+        if not params:
+            return
+        follows = follows.filter(user_id__in=params)
+        entries = entries.filter(user_id__in=params)
+        condition = f' AND f.user_id IN ({", ".join(["%s"] * len(params))})'
+    heavy = (
+        Follow.objects
+        .filter(author_id__in=follows.values('author_id'))
+        .values('author_id')
+        .annotate(followers=Count('pk'))
+        .filter(followers__gt=settings.FOLLOW_FANOUT_LIMIT)
+        .values('author_id')
+        .order_by()
+    )
+    Follow.objects.filter(author_id__in=heavy).update(fanout=False)
+    entries.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TimelineEntry._meta.db_table} '
+            '(user_id, post_id, author_id, created) '
+            'SELECT f.user_id, p.id, p.author_id, p.created '
+            f'FROM {Follow._meta.db_table} f '
+            f'JOIN {Post._meta.db_table} p ON p.author_id = f.author_id '
+            'WHERE f.fanout' + condition,
+            params
+        )
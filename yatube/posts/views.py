@@ -1,110 +1,187 @@
-from django.core.paginator import Paginator
 from django.shortcuts import render, redirect
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
 
-from yatube.settings import POSTS_PAGE_COUNT
+from core.cache import fragment_key
+from core.db import ensure_fresh
+from core.decorators import cache_anonymous, conditional_page
+from core.paginator import cursor_page, get_cursor_page
+from core.queries import query_budget
+from yatube.settings import (
+    COMMENTS_PAGE_COUNT, FEED_CACHE_TIMEOUT, POSTS_PAGE_COUNT
+)
+from .export import CONTENT_TYPES, export_chunks
 from .models import Post, Group, Follow
 from .forms import PostForm, PostEditForm, CommentForm
+from .search import SearchPaginator
+from .stats import get_stats
+from .timeline import follow_paginator
 
 User = get_user_model()
 
 
+def post_list(**filters):
+    """Посты ленты; общий запрос страниц и RSS/Atom-лент."""
+    return Post.objects.filter(**filters).select_related('author', 'group')
+
+
+def index_page_scopes():
+    return ['posts']
+
+
+def group_page_scopes(slug):
+    group_id = (
+        Group.objects.filter(slug=slug).values_list('pk', flat=True).first()
+    )
+    return group_id and [f'group:{group_id}', 'users']
+
+
+def profile_page_scopes(username):
+    author_id = (
+        User.objects
+        .filter(username=username)
+        .values_list('pk', flat=True)
+        .first()
+    )
+    return author_id and [f'author:{author_id}', f'stats:{author_id}',
+                          'groups']
+
+
+def post_page_scopes(post_id):
+    post = Post.objects.filter(pk=post_id).values('author_id', 'group_id')
+    post = post.first()
+    if post is None:
+        return None
+    scopes = [
+        f'post:{post_id}',
+        f'author:{post["author_id"]}',
+        f'stats:{post["author_id"]}',
+    ]
+    if post['group_id']:
+        scopes.append(f'group:{post["group_id"]}')
+    return scopes
+
+
+@query_budget(4)
+@conditional_page(index_page_scopes)
+@cache_anonymous(index_page_scopes)
 def index(request):
     template = 'posts/index.html'
-    page_number = request.GET.get('page')
-    page_obj = Paginator(
-        Post.objects
-        .select_related('author', 'group'),
-        POSTS_PAGE_COUNT
-    ).get_page(page_number)
+    page_obj = get_cursor_page(request, post_list(), POSTS_PAGE_COUNT)
     context = {
         'page_obj': page_obj,
+        'cache_key': fragment_key(request, page_obj, 'posts'),
+        'cache_timeout': FEED_CACHE_TIMEOUT,
         'title': 'Последние обновления на сайте'
     }
     return render(request, template, context)
 
 
+@query_budget(6)
+@conditional_page(group_page_scopes)
+@cache_anonymous(group_page_scopes)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
-    page_number = request.GET.get('page')
-    page_obj = Paginator(
-        Post.objects
-        .filter(group__slug=slug)
-        .select_related('author', 'group'),
-        POSTS_PAGE_COUNT
-    ).get_page(page_number)
     group = get_object_or_404(Group, slug=slug)
+    page_obj = get_cursor_page(
+        request, post_list(group=group), POSTS_PAGE_COUNT
+    )
     context = {
         'group': group,
         'page_obj': page_obj,
+        'cache_key': fragment_key(
+            request, page_obj, f'group:{group.pk}', 'users'
+        ),
+        'cache_timeout': FEED_CACHE_TIMEOUT,
         'title': f'Записи сообщества {group}'
     }
     return render(request, template, context)
 
 
+@query_budget(10)
+@conditional_page(profile_page_scopes)
+@cache_anonymous(profile_page_scopes)
 def profile(request, username):
-    following = False
     template = 'posts/profile.html'
-    page_number = request.GET.get('page')
-    post_list = (
-        Post.objects.
-        filter(author__username=username)
-        .select_related('author', 'group')
-    )
-    page_obj = Paginator(
-        post_list,
-        POSTS_PAGE_COUNT
-    ).get_page(page_number)
     author = get_object_or_404(User, username=username)
-    if request.user.is_authenticated:
-        subscribes = (
-            Follow.objects
-            .filter(user=request.user)
-            .select_related('user', 'author')
-        )
-        for i in subscribes:
-            if i.author == author:
-                following = True
-    subscribers = len(
-        Follow.objects
-        .filter(author__username=username)
-        .select_related('user', 'author')
+    page_obj = get_cursor_page(
+        request, post_list(author=author), POSTS_PAGE_COUNT
+    )
+    following = (
+        request.user.is_authenticated
+        and Follow.objects.filter(user=request.user, author=author).exists()
     )
     context = {
-        'subscribers': subscribers,
+        'author_stats': get_stats(author),
         'following': following,
         'title': f'Профайл пользователя {username}',
         'page_obj': page_obj,
+        'cache_key': fragment_key(
+            request, page_obj, f'author:{author.pk}', 'groups'
+        ),
+        'cache_timeout': FEED_CACHE_TIMEOUT,
         'author': author,
-        'post_list': post_list,
     }
     return render(request, template, context)
 
 
+@query_budget(9)
+@conditional_page(post_page_scopes)
+@cache_anonymous(post_page_scopes)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
-    post_list = (
-        Post.objects
-        .filter(
-            author__username=post.author.username
-        )
-        .select_related('author', 'group')
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
+    comments = get_cursor_page(
+        request,
+        post.comments.select_related('author'),
+        COMMENTS_PAGE_COUNT,
+        descending=False
     )
-    comments = post.comments.select_related('author', 'post')
     form = CommentForm(request.POST or None)
     context = {
         'comments': comments,
         'title': post,
         'post': post,
-        'post_list': post_list,
+        'author_stats': get_stats(post.author),
         'form': form,
     }
     return render(request, template, context)
 
 
+@query_budget(3)
+def post_comments(request, post_id):
+    post = get_object_or_404(Post, id=post_id)
+    comments = get_cursor_page(
+        request,
+        post.comments.select_related('author'),
+        COMMENTS_PAGE_COUNT,
+        descending=False
+    )
+    context = {
+        'comments': comments,
+        'post': post,
+    }
+    return render(request, 'posts/includes/comments_cycle.html', context)
+
+
+@query_budget(5)
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = cursor_page(request, SearchPaginator(query, POSTS_PAGE_COUNT))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'title': f'Поиск: {query}' if query else 'Поиск',
+    }
+    return render(request, template, context)
+
+
+@query_budget(16)
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
@@ -125,6 +202,7 @@ def post_create(request):
     return render(request, 'posts/create_post.html', {'form': form})
 
 
+@query_budget(20)
 @login_required
 def post_edit(request, post_id):
     is_edit = True
@@ -146,6 +224,7 @@ def post_edit(request, post_id):
     return render(request, 'posts/create_post.html', context)
 
 
+@query_budget(5)
 @login_required
 def add_comment(request, post_id):
     post = Post.objects.get(id=post_id)
@@ -158,48 +237,56 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(5)
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    # post_list = Post.objects.all()
-    subscribes = []
-    subscribes_query = (
-        Follow.objects
-        .select_related('user', 'author')
-        .filter(user=request.user)
+    ensure_fresh('posts', f'follows:{request.user.pk}')
+    page_obj = cursor_page(
+        request,
+        follow_paginator(request.user, POSTS_PAGE_COUNT)
     )
-    for i in subscribes_query:
-        subscribes.append(i.author.username)
-    post_list = (
-        Post.objects
-        .filter(author__username__in=subscribes)
-        .select_related('author', 'group')
-    )
-    paginator = Paginator(post_list, POSTS_PAGE_COUNT)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
+        'cache_key': fragment_key(
+            request, page_obj, 'posts', f'follows:{request.user.pk}'
+        ),
+        'cache_timeout': FEED_CACHE_TIMEOUT,
         'title': 'Мои подписки'
     }
     return render(request, template, context)
 
 
+@login_required
+def profile_export(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.user != author and not request.user.is_staff:
+        return redirect('posts:profile', username)
+    export_format = request.GET.get('format')
+    if export_format not in CONTENT_TYPES:
+        export_format = 'jsonl'
+    response = StreamingHttpResponse(
+        export_chunks(
+            author, export_format, Post._meta.get_field('image').storage
+        ),
+        content_type=CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{username}.{export_format}"'
+    )
+    return response
+
+
+@query_budget(12)
 @login_required
 def profile_follow(request, username):
     if username != request.user.username:
-        subscribes = []
-        subscribes_query = Follow.objects.filter(user=request.user)
-        for i in subscribes_query:
-            subscribes.append(i.author.username)
-        if username not in subscribes:
-            Follow.objects.create(
-                user=request.user,
-                author=User.objects.get(username=username)
-            )
+        author = get_object_or_404(User, username=username)
+        Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', username)
 
 
+@query_budget(9)
 @login_required
 def profile_unfollow(request, username):
     Follow.objects.get(
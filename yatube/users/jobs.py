@@ -0,0 +1,12 @@
+"""Фоновые задачи приложения users."""
+from django.core.mail import EmailMultiAlternatives
+
+from core.queue import job
+
+
+@job
+def send_mail(subject, body, from_email, to, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body is not None:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
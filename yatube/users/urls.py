@@ -2,6 +2,7 @@ from django.contrib.auth import views as v
 from django.urls import path, reverse_lazy
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 app_name = 'users'
 
@@ -41,6 +42,7 @@ urlpatterns = [
         'password_reset/',
         v.PasswordResetView.as_view(
             template_name='users/password_reset_form.html',
+            form_class=QueuedPasswordResetForm,
         ),
         name='password_reset',
     ),
@@ -18,6 +18,33 @@ ALLOWED_HOSTS = [
 ]
 
 POSTS_PAGE_COUNT = 10
+COMMENTS_PAGE_COUNT = 20
+# записей в RSS/Atom-лентах
+SYNDICATION_ITEMS = 20
+
+# фрагменты лент сбрасываются версиями областей кэша, а не по времени
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+# целые страницы для анонимов; 0 отключает кэш страниц
+PAGE_CACHE_TIMEOUT = 60 * 60 * 6
+
+# сколько подписчиков автора получают посты в материализованную ленту;
+# посты авторов с большим числом подписчиков подмешиваются при чтении
+FOLLOW_FANOUT_LIMIT = 1000
+
+# уменьшенные копии картинок постов: размер -> геометрия sorl.thumbnail
+POST_IMAGE_VARIANTS = {
+    'feed': '640',
+    'detail': '1280',
+}
+POST_IMAGE_QUALITY = 85
+
+# фоновые задачи core.queue, выполняются командой run_jobs
+JOB_WORKERS = 4
+JOB_MAX_ATTEMPTS = 5
+# задержка перед повтором, секунд; удваивается с каждой попыткой
+JOB_RETRY_DELAY = 10
+# задача в работе дольше этого считается брошенной и возвращается в очередь
+JOB_LOCK_TIMEOUT = 60 * 10
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -36,6 +63,7 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
     'core.apps.CoreConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -47,7 +75,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.timing.ServerTimingMiddleware',
+    'core.queries.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.db.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,7 +99,7 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.TimedDjangoTemplates',
         'DIRS': [TEMPLATE_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -89,12 +120,55 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # соединение живёт между запросами, PRAGMA не повторяются
+        'CONN_MAX_AGE': int(os.getenv('YATUBE_CONN_MAX_AGE', 600)),
     }
 }
 
+# выполняются для каждого нового соединения SQLite (core.sqlite)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    # 256 МБ отображаются в память, кэш страниц - 64 МБ
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# реплики только для чтения; локально - копии базы, которые
+# обновляет команда sync_replicas
+DATABASE_REPLICAS = []
+for number in range(1, int(os.getenv('YATUBE_DB_REPLICAS', 0)) + 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db.replica{number}.sqlite3'),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+# сколько секунд после записи пользователь читает из основной базы
+REPLICA_PIN_SECONDS = 10
+# реплика, отставшая сильнее, не используется
+REPLICA_MAX_LAG = 10
+# сколько раз представление может выполнить один и тот же запрос,
+# если в его бюджете (core.queries.query_budget) не указано иное
+QUERY_MAX_REPEATS = 3
+# заголовок Server-Timing и лог core.timing с временем базы,
+# кэша и шаблонов
+SERVER_TIMING = True
+# профилировщик шаблонов (core.template_profiler); отчёт -
+# команда template_profile
+TEMPLATE_PROFILER = os.getenv('YATUBE_TEMPLATE_PROFILER') == '1'
+# как часто счётчики профилировщика сбрасываются в базу, секунд
+TEMPLATE_PROFILER_FLUSH = 5
+# снимки баз, созданных командой seed
+SEED_SNAPSHOT_DIR = os.path.join(BASE_DIR, 'snapshots')
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.timing.TimedLocMemCache',
     }
 }
 
@@ -8,6 +8,7 @@ handler403 = 'core.views.csrf_failure'
 handler500 = 'core.views.handler500'
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/', include('api.urls', namespace='api')),
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace='posts')),